@@ -1,31 +1,268 @@
 from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from itertools import islice
+import os
+import re
+import sys
 
 # Interface comum
 class FileSystemComponent(ABC):
+    pai = None
+
     def __init__(self, nome):
         self.nome = nome
 
+    @property
+    def caminho(self):
+        nomes = []
+        no = self
+        while no is not None:
+            nomes.append(no.nome)
+            no = no.pai
+        return "/".join(reversed(nomes))
+
     @abstractmethod
     def exibir(self, indent=0): pass
 
+    def linhas(self, indent=0):
+        # Percurso iterativo com pilha de iteradores: filhos saem na ordem em que aparecem
+        prefixos = []
+        pilha = [(iter((self,)), indent)]
+        while pilha:
+            filhos, nivel = pilha[-1]
+            no = next(filhos, None)
+            if no is None:
+                pilha.pop()
+                continue
+            while len(prefixos) <= nivel:
+                prefixos.append("  " * len(prefixos))
+            yield f"{prefixos[nivel]}{no.icone} {no.nome}"
+            if isinstance(no, Pasta):
+                pilha.append((no.iterar(), nivel + 1))
+
+    def escrever(self, saida, indent=0, linhas_por_bloco=4096):
+        # Escreve em blocos no destino (arquivo, sys.stdout, io.StringIO...)
+        bloco = []
+        for linha in self.linhas(indent):
+            bloco.append(linha)
+            if len(bloco) >= linhas_por_bloco:
+                bloco.append("")
+                saida.write("\n".join(bloco))
+                bloco.clear()
+        if bloco:
+            bloco.append("")
+            saida.write("\n".join(bloco))
+
 # Folha
 class Arquivo(FileSystemComponent):
+    icone = "📄"
+
     def exibir(self, indent=0):
         print("  " * indent + f"📄 {self.nome}")
 
 # Composto
 class Pasta(FileSystemComponent):
+    icone = "📁"
+
     def __init__(self, nome):
         super().__init__(nome)
         self._itens = []
+        # Índice caminho completo -> componente, mantido só na raiz e criado sob demanda
+        self._indice = None
+        self._chaves_ordenadas = None
+
+    def _raiz(self):
+        no = self
+        while no.pai is not None:
+            no = no.pai
+        return no
+
+    @staticmethod
+    def _subarvore(componente: FileSystemComponent):
+        pilha = [(componente.caminho, componente)]
+        while pilha:
+            caminho, no = pilha.pop()
+            yield caminho, no
+            if isinstance(no, Pasta):
+                pilha.extend((f"{caminho}/{filho.nome}", filho) for filho in no.iterar())
 
     def adicionar(self, componente: FileSystemComponent):
+        # Nomes repetidos colidiriam no índice por caminho
+        if any(item.nome == componente.nome for item in self._itens):
+            raise ValueError(f"Já existe '{componente.nome}' em {self.caminho}")
         self._itens.append(componente)
+        componente.pai = self
+        if isinstance(componente, Pasta):
+            componente._indice = componente._chaves_ordenadas = None
+        raiz = self._raiz()
+        if raiz._indice is not None:
+            raiz._indice.update(self._subarvore(componente))
+            raiz._chaves_ordenadas = None
+
+    def remover(self, componente: FileSystemComponent):
+        # Remove da lista primeiro: se o componente não for filho, o índice fica intacto
+        self._itens.remove(componente)
+        raiz = self._raiz()
+        if raiz._indice is not None:
+            for caminho, _ in self._subarvore(componente):
+                raiz._indice.pop(caminho, None)
+            raiz._chaves_ordenadas = None
+        componente.pai = None
+
+    def _obter_indice(self):
+        raiz = self._raiz()
+        if raiz._indice is None:
+            raiz._indice = dict(self._subarvore(raiz))
+        return raiz._indice
+
+    def localizar(self, caminho):
+        # caminho completo a partir da raiz, ex.: "root/Documentos/contrato.docx"
+        return self._obter_indice().get(caminho)
+
+    def buscar(self, padrao):
+        # Padrão no estilo glob ("root/Imagens/*.png"), casado segmento a segmento
+        # ("*" não atravessa "/"); o prefixo fixo é resolvido por busca binária
+        indice = self._obter_indice()
+        raiz = self._raiz()
+        if raiz._chaves_ordenadas is None:
+            raiz._chaves_ordenadas = sorted(indice)
+        chaves = raiz._chaves_ordenadas
+        prefixo = _prefixo_fixo(padrao)
+        segmentos = padrao.split("/")
+        for chave in islice(chaves, bisect_left(chaves, prefixo), None):
+            if not chave.startswith(prefixo):
+                break
+            if _casa_segmentos(chave.split("/"), segmentos):
+                yield indice[chave]
+
+    def iterar(self):
+        return iter(self._itens)
 
     def exibir(self, indent=0):
-        print("  " * indent + f"📁 {self.nome}")
-        for item in self._itens:
-            item.exibir(indent + 1)
+        self.escrever(sys.stdout, indent)
+
+def _prefixo_fixo(padrao):
+    return re.split(r"[*?\[]", padrao, maxsplit=1)[0]
+
+def _casa_segmentos(partes, segmentos):
+    return len(partes) == len(segmentos) and all(map(fnmatchcase, partes, segmentos))
+
+# Folha do sistema de arquivos real (stat vem do DirEntry, com cache)
+class ArquivoSistema(Arquivo):
+    def __init__(self, entrada: os.DirEntry):
+        super().__init__(entrada.name)
+        self._entrada = entrada
+
+    @property
+    def tamanho(self):
+        return self._entrada.stat(follow_symlinks=False).st_size
+
+# Composto preguiçoso: lê o diretório com os.scandir só quando é percorrido
+class PastaSistema(Pasta):
+    # Limite do LRU de pastas carregadas; cada árvore mantém o seu LRU na raiz
+    limite_carregadas = 10_000
+
+    def __init__(self, caminho_disco, nome=None):
+        FileSystemComponent.__init__(self, nome or os.path.basename(os.path.normpath(caminho_disco)))
+        self.caminho_disco = caminho_disco
+        self._filhos = None
+        self._fixada = False
+        self.erro = None  # OSError da última leitura (sem permissão, apagada...), se houve
+        self._carregadas = None
+        self._indice = self._chaves_ordenadas = None
+
+    @property
+    def _itens(self):
+        if self._filhos is None:
+            for _ in self.iterar():
+                pass
+        self._tocar()
+        return self._filhos
+
+    def _tocar(self):
+        # As mais frias são liberadas ao passar do limite
+        raiz = self._raiz()
+        if raiz._carregadas is None:
+            raiz._carregadas = OrderedDict()
+        carregadas = raiz._carregadas
+        carregadas[self] = None
+        carregadas.move_to_end(self)
+        while len(carregadas) > raiz.limite_carregadas:
+            fria, _ = carregadas.popitem(last=False)
+            fria.liberar()
+
+    def iterar(self):
+        # Entrega os filhos à medida que são descobertos
+        if self._filhos is not None:
+            self._tocar()
+            yield from self._filhos
+            return
+        filhos = []
+        self.erro = None
+        try:
+            with os.scandir(self.caminho_disco) as entradas:
+                for entrada in entradas:
+                    if entrada.is_dir(follow_symlinks=False):
+                        filho = PastaSistema(entrada.path, entrada.name)
+                    else:
+                        filho = ArquivoSistema(entrada)
+                    filho.pai = self
+                    filhos.append(filho)
+                    yield filho
+        except OSError as erro:
+            # Uma pasta ilegível fica com o que deu para ler; o percurso segue nas demais
+            self.erro = erro
+        self._filhos = filhos
+        self._tocar()
+
+    def adicionar(self, componente: FileSystemComponent):
+        # Pastas com itens adicionados à mão não podem ser descartadas, nem as ancestrais
+        # (liberar uma ancestral descartaria a pasta fixada junto com os filhos)
+        super().adicionar(componente)
+        no = self
+        while isinstance(no, PastaSistema) and not no._fixada:
+            no._fixada = True
+            no = no.pai
+
+    def liberar(self):
+        if not self._fixada:
+            self._filhos = None
+            carregadas = self._raiz()._carregadas
+            if carregadas is not None:
+                carregadas.pop(self, None)
+
+    # Em árvores preguiçosas não há índice global: resolve nível a nível, sem varrer tudo
+    def localizar(self, caminho):
+        no = self._raiz()
+        partes = caminho.split("/")
+        if partes[0] != no.nome:
+            return None
+        for parte in partes[1:]:
+            if not isinstance(no, Pasta):
+                return None
+            no = next((filho for filho in no._itens if filho.nome == parte), None)
+            if no is None:
+                return None
+        return no
+
+    def buscar(self, padrao):
+        # Desce um nível por segmento do padrão, só pelas pastas cujo nome casa
+        segmentos = padrao.split("/")
+        raiz = self._raiz()
+        if not fnmatchcase(raiz.nome, segmentos[0]):
+            return
+        pilha = [(raiz, 1)]
+        while pilha:
+            no, nivel = pilha.pop()
+            if nivel == len(segmentos):
+                yield no
+                continue
+            if isinstance(no, Pasta):
+                segmento = segmentos[nivel]
+                casados = [filho for filho in no.iterar() if fnmatchcase(filho.nome, segmento)]
+                pilha.extend((filho, nivel + 1) for filho in reversed(casados))
 
 # Cliente
 if __name__ == "__main__":
@@ -44,3 +281,14 @@ if __name__ == "__main__":
     raiz.adicionar(Arquivo("README.md"))
 
     raiz.exibir()
+
+    print("\n--- Busca por caminho ---")
+    print(raiz.localizar("root/Documentos/contrato.docx").nome)
+    print([item.nome for item in raiz.buscar("root/Imagens/*")])
+    pasta_docs.remover(pasta_docs.localizar("root/Documentos/curriculo.pdf"))
+    print(raiz.localizar("root/Documentos/curriculo.pdf"))
+
+    print("\n--- Diretório real, lido sob demanda ---")
+    diretorio = PastaSistema(os.path.dirname(os.path.abspath(__file__)))
+    diretorio.exibir()
+    print([item.caminho for item in diretorio.buscar(f"{diretorio.nome}/*.py")])
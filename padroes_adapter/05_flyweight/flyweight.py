@@ -1,3 +1,11 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import os
+import sys
+import threading
+import weakref
+
 # Flyweight
 class TipoArvore:
     def __init__(self, nome, cor, textura):
@@ -10,14 +18,39 @@ class TipoArvore:
 
 # Flyweight Factory
 class FabricaTiposArvore:
-    _tipos = {}
+    # Tipos sem nenhuma referência externa são liberados automaticamente
+    _tipos = weakref.WeakValueDictionary()
+    _lock = threading.Lock()
+    _acertos = 0
+    _falhas = 0
 
     @classmethod
     def obter_tipo(cls, nome, cor, textura):
         chave = (nome, cor, textura)
-        if chave not in cls._tipos:
-            cls._tipos[chave] = TipoArvore(nome, cor, textura)
-        return cls._tipos[chave]
+        # Caminho rápido sem lock: leitura de dict é atômica no CPython
+        tipo = cls._tipos.get(chave)
+        if tipo is not None:
+            cls._acertos += 1  # contagem aproximada sob concorrência
+            return tipo
+        with cls._lock:
+            tipo = cls._tipos.get(chave)
+            if tipo is None:
+                tipo = TipoArvore(nome, cor, textura)
+                cls._tipos[chave] = tipo
+                cls._falhas += 1
+            else:
+                cls._acertos += 1
+            return tipo
+
+    @classmethod
+    def estatisticas(cls):
+        tamanho_tipo = sys.getsizeof(TipoArvore("", "", "")) + sys.getsizeof({})
+        return {
+            "acertos": cls._acertos,
+            "falhas": cls._falhas,
+            "tipos_vivos": len(cls._tipos),
+            "bytes_economizados": cls._acertos * tamanho_tipo,
+        }
 
 # Contexto (estado extrínseco)
 class Arvore:
@@ -29,22 +62,261 @@ class Arvore:
     def renderizar(self):
         self.tipo.renderizar(self.x, self.y)
 
+# Índice espacial: grade uniforme de células
+class GradeEspacial:
+    def __init__(self, tamanho_celula):
+        if tamanho_celula <= 0:
+            raise ValueError("tamanho_celula deve ser positivo")
+        self.tamanho_celula = tamanho_celula
+        self._celulas = {}
+        self._limites = None  # (cx mín, cy mín, cx máx, cy máx) das células ocupadas
+
+    def _celula(self, x, y):
+        return (x // self.tamanho_celula, y // self.tamanho_celula)
+
+    def _ocupar(self, chave):
+        cx, cy = chave
+        if self._limites is None:
+            self._limites = (cx, cy, cx, cy)
+        else:
+            mx0, my0, mx1, my1 = self._limites
+            self._limites = (min(mx0, cx), min(my0, cy), max(mx1, cx), max(my1, cy))
+
+    def inserir(self, x, y, item):
+        chave = self._celula(x, y)
+        celula = self._celulas.get(chave)
+        if celula is None:
+            celula = self._celulas[chave] = []
+            self._ocupar(chave)
+        celula.append((x, y, item))
+
+    def _celulas_da_regiao(self, x0, y0, x1, y1):
+        # O custo acompanha as células ocupadas, não a área da região consultada
+        if self._limites is None:
+            return
+        mx0, my0, mx1, my1 = self._limites
+        cx0, cy0 = self._celula(x0, y0)
+        cx1, cy1 = self._celula(x1, y1)
+        cx0, cy0 = int(max(cx0, mx0)), int(max(cy0, my0))
+        cx1, cy1 = int(min(cx1, mx1)), int(min(cy1, my1))
+        if cx0 > cx1 or cy0 > cy1:
+            return
+        celulas = self._celulas
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(celulas):
+            for (cx, cy), celula in celulas.items():
+                if cx0 <= cx <= cx1 and cy0 <= cy <= cy1:
+                    yield celula
+            return
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                celula = celulas.get((cx, cy))
+                if celula:
+                    yield celula
+
+    def consultar(self, x0, y0, x1, y1):
+        x0, x1 = min(x0, x1), max(x0, x1)
+        y0, y1 = min(y0, y1), max(y0, y1)
+        for celula in self._celulas_da_regiao(x0, y0, x1, y1):
+            for x, y, item in celula:
+                if x0 <= x <= x1 and y0 <= y <= y1:
+                    yield item
+
+# Grade para a floresta colunar: cada célula guarda só índices (4 bytes por árvore);
+# as coordenadas são lidas das próprias colunas xs/ys
+class GradeIndices(GradeEspacial):
+    def __init__(self, tamanho_celula, xs, ys):
+        super().__init__(tamanho_celula)
+        self._xs = xs
+        self._ys = ys
+
+    def inserir(self, x, y, indice):
+        chave = self._celula(x, y)
+        celula = self._celulas.get(chave)
+        if celula is None:
+            celula = self._celulas[chave] = array("I")
+            self._ocupar(chave)
+        celula.append(indice)
+
+    def consultar(self, x0, y0, x1, y1):
+        x0, x1 = min(x0, x1), max(x0, x1)
+        y0, y1 = min(y0, y1), max(y0, y1)
+        xs, ys = self._xs, self._ys
+        for celula in self._celulas_da_regiao(x0, y0, x1, y1):
+            for i in celula:
+                if x0 <= xs[i] <= x1 and y0 <= ys[i] <= y1:
+                    yield i
+
 # Cliente
 class Floresta:
-    def __init__(self):
+    def __init__(self, tamanho_celula=None):
         self.arvores = []
+        self._grade = GradeEspacial(tamanho_celula) if tamanho_celula is not None else None
 
     def plantar_arvore(self, x, y, nome, cor, textura):
         tipo = FabricaTiposArvore.obter_tipo(nome, cor, textura)
-        self.arvores.append(Arvore(x, y, tipo))
+        arvore = Arvore(x, y, tipo)
+        self.arvores.append(arvore)
+        if self._grade is not None:
+            self._grade.inserir(x, y, arvore)
 
     def renderizar(self):
         for arvore in self.arvores:
             arvore.renderizar()
 
+    def consultar_regiao(self, x0, y0, x1, y1):
+        if self._grade is not None:
+            return list(self._grade.consultar(x0, y0, x1, y1))
+        x0, x1 = min(x0, x1), max(x0, x1)
+        y0, y1 = min(y0, y1), max(y0, y1)
+        return [a for a in self.arvores if x0 <= a.x <= x1 and y0 <= a.y <= y1]
+
+    def renderizar_regiao(self, x0, y0, x1, y1):
+        for arvore in self.consultar_regiao(x0, y0, x1, y1):
+            arvore.renderizar()
+
+# Cliente colunar: posições e ids de tipo em arrays contíguos
+class FlorestaColunar:
+    def __init__(self, tamanho_celula=None):
+        self.xs = array("i")
+        self.ys = array("i")
+        self.ids_tipo = array("H")
+        self._tipos = []
+        self._id_por_tipo = {}
+        self._grade = None
+        if tamanho_celula is not None:
+            self._grade = GradeIndices(tamanho_celula, self.xs, self.ys)
+
+    def _id_do_tipo(self, tipo: TipoArvore):
+        id_tipo = self._id_por_tipo.get(tipo)
+        if id_tipo is None:
+            id_tipo = len(self._tipos)
+            self._tipos.append(tipo)
+            self._id_por_tipo[tipo] = id_tipo
+        return id_tipo
+
+    def plantar_arvore(self, x, y, nome, cor, textura):
+        tipo = FabricaTiposArvore.obter_tipo(nome, cor, textura)
+        if self._grade is not None:
+            self._grade.inserir(x, y, len(self.xs))
+        self.xs.append(x)
+        self.ys.append(y)
+        self.ids_tipo.append(self._id_do_tipo(tipo))
+
+    def plantar_arvores(self, xs, ys, tipos):
+        # tipos: sequência de TipoArvore (um por árvore)
+        novos_xs = array("i", xs)
+        novos_ys = array("i", ys)
+        tipos = list(tipos)
+        if not len(novos_xs) == len(novos_ys) == len(tipos):
+            raise ValueError("xs, ys e tipos devem ter o mesmo tamanho")
+        # Só registra os tipos depois de validar a entrada
+        ids = array("H", map(self._id_do_tipo, tipos))
+        if self._grade is not None:
+            inicio = len(self.xs)
+            for i, (x, y) in enumerate(zip(novos_xs, novos_ys), inicio):
+                self._grade.inserir(x, y, i)
+        self.xs.extend(novos_xs)
+        self.ys.extend(novos_ys)
+        self.ids_tipo.extend(ids)
+
+    def __len__(self):
+        return len(self.xs)
+
+    def __iter__(self):
+        tipos = self._tipos
+        for x, y, id_tipo in zip(self.xs, self.ys, self.ids_tipo):
+            yield x, y, tipos[id_tipo]
+
+    def renderizar(self):
+        for x, y, tipo in self:
+            tipo.renderizar(x, y)
+
+    def consultar_regiao(self, x0, y0, x1, y1):
+        xs, ys, ids, tipos = self.xs, self.ys, self.ids_tipo, self._tipos
+        if self._grade is not None:
+            indices = self._grade.consultar(x0, y0, x1, y1)
+        else:
+            x0, x1 = min(x0, x1), max(x0, x1)
+            y0, y1 = min(y0, y1), max(y0, y1)
+            indices = (i for i in range(len(xs))
+                       if x0 <= xs[i] <= x1 and y0 <= ys[i] <= y1)
+        return [(xs[i], ys[i], tipos[ids[i]]) for i in indices]
+
+    def renderizar_regiao(self, x0, y0, x1, y1):
+        for x, y, tipo in self.consultar_regiao(x0, y0, x1, y1):
+            tipo.renderizar(x, y)
+
+# Floresta em memória compartilhada: processos leem fatias sem cópia
+_trabalhador = {}
+
+def _inicializar_trabalhador(nome_memoria, total, tipos):
+    memoria = shared_memory.SharedMemory(name=nome_memoria)
+    buf = memoria.buf
+    _trabalhador["memoria"] = memoria
+    _trabalhador["xs"] = buf[:4 * total].cast("i")
+    _trabalhador["ys"] = buf[4 * total:8 * total].cast("i")
+    _trabalhador["ids_tipo"] = buf[8 * total:10 * total].cast("H")
+    # Tabela de tipos enviada uma única vez por processo
+    _trabalhador["tipos"] = [FabricaTiposArvore.obter_tipo(*t) for t in tipos]
+
+def _executar_fatia(tarefa):
+    funcao, inicio, fim = tarefa
+    t = _trabalhador
+    return funcao(t["xs"], t["ys"], t["ids_tipo"], t["tipos"], inicio, fim)
+
+def renderizar_fatia(xs, ys, ids_tipo, tipos, inicio, fim):
+    for i in range(inicio, fim):
+        tipos[ids_tipo[i]].renderizar(xs[i], ys[i])
+    return fim - inicio
+
+class FlorestaCompartilhada:
+    def __init__(self, floresta: FlorestaColunar, processos=None):
+        self.processos = processos or os.cpu_count() or 1
+        self._executor = None
+        self.total = total = len(floresta)
+        self._memoria = shared_memory.SharedMemory(create=True, size=max(1, 10 * total))
+        buf = self._memoria.buf
+        buf[:4 * total] = memoryview(floresta.xs).cast("B")
+        buf[4 * total:8 * total] = memoryview(floresta.ys).cast("B")
+        buf[8 * total:10 * total] = memoryview(floresta.ids_tipo).cast("B")
+        self._tipos = [(t.nome, t.cor, t.textura) for t in floresta._tipos]
+
+    def _obter_executor(self):
+        # Pool criado no primeiro uso e reaproveitado: cada processo mapeia a memória uma vez só
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processos,
+                initializer=_inicializar_trabalhador,
+                initargs=(self._memoria.name, self.total, self._tipos),
+            )
+        return self._executor
+
+    def mapear_fatias(self, funcao):
+        # funcao(xs, ys, ids_tipo, tipos, inicio, fim) deve ser definida no nível do módulo
+        tamanho = max(1, -(-self.total // self.processos))
+        tarefas = [(funcao, i, min(i + tamanho, self.total))
+                   for i in range(0, self.total, tamanho)]
+        return list(self._obter_executor().map(_executar_fatia, tarefas))
+
+    def renderizar(self):
+        return sum(self.mapear_fatias(renderizar_fatia))
+
+    def fechar(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        self._memoria.close()
+        self._memoria.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
 # Teste
 if __name__ == "__main__":
-    floresta = Floresta()
+    floresta = Floresta(tamanho_celula=4)
     floresta.plantar_arvore(1, 2, "Ipê", "Amarelo", "Lisa")
     floresta.plantar_arvore(3, 4, "Ipê", "Amarelo", "Lisa")
     floresta.plantar_arvore(5, 6, "Jacarandá", "Roxo", "Cascuda")
@@ -52,3 +324,26 @@ if __name__ == "__main__":
     floresta.renderizar()
 
     print("\nTotal de tipos únicos:", len(FabricaTiposArvore._tipos))
+    print("Estatísticas da fábrica:", FabricaTiposArvore.estatisticas())
+
+    print("\n--- Região visível (0,0)-(4,4) ---")
+    floresta.renderizar_regiao(0, 0, 4, 4)
+
+    print("\n--- Floresta colunar ---")
+    colunar = FlorestaColunar(tamanho_celula=4)
+    ipe = FabricaTiposArvore.obter_tipo("Ipê", "Amarelo", "Lisa")
+    jacaranda = FabricaTiposArvore.obter_tipo("Jacarandá", "Roxo", "Cascuda")
+    colunar.plantar_arvores([1, 3, 5], [2, 4, 6], [ipe, ipe, jacaranda])
+    colunar.plantar_arvore(7, 8, "Ipê", "Amarelo", "Lisa")
+    colunar.renderizar()
+
+    bytes_por_arvore = colunar.xs.itemsize + colunar.ys.itemsize + colunar.ids_tipo.itemsize
+    print(f"\nÁrvores: {len(colunar)} | bytes por árvore: {bytes_por_arvore}")
+
+    print("\n--- Região colunar (4,4)-(8,8) ---")
+    colunar.renderizar_regiao(4, 4, 8, 8)
+
+    print("\n--- Floresta compartilhada (2 processos) ---")
+    with FlorestaCompartilhada(colunar, processos=2) as compartilhada:
+        renderizadas = compartilhada.renderizar()
+    print(f"Árvores renderizadas: {renderizadas}")
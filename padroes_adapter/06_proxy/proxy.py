@@ -1,4 +1,10 @@
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+import json
+import mmap
+import os
+import tempfile
+import threading
 import time
 
 # Interface comum
@@ -8,34 +14,283 @@ class ServicoVideo(ABC):
 
 # Objeto real
 class Youtube(ServicoVideo):
-    def assistir(self, video_id: str):
+    def carregar(self, video_id: str):
         print(f"🔴 Carregando vídeo {video_id} do YouTube...")
         time.sleep(1)  # simula tempo de rede
+        return f"<conteúdo de {video_id}>".encode()
+
+    def assistir(self, video_id: str):
+        conteudo = self.carregar(video_id)
         print(f"▶️ Reproduzindo {video_id}")
+        return conteudo
 
-# Proxy com cache
-class YoutubeProxy(ServicoVideo):
+# Segundo nível de cache: segmento em disco mapeado em memória + log de índice.
+# A primeira linha do log aponta o segmento em uso; trocar o log troca os dois de uma vez
+class CacheDisco:
+    def __init__(self, diretorio, fator_compactacao=2, minimo_compactacao=1024,
+                 minimo_bytes_mortos=1 << 20):
+        os.makedirs(diretorio, exist_ok=True)
+        self._diretorio = diretorio
+        self._caminho_indice = os.path.join(diretorio, "indice.log")
+        self._segmento = "segmento.dat"
+        self._indice = {}  # video_id -> [deslocamento, tamanho, expiração (epoch) ou None]
+        self._registros, incompleto = self._carregar_indice()
+        self._arquivo = open(os.path.join(diretorio, self._segmento), "a+b")
+        self._log = open(self._caminho_indice, "a")
+        self._fator_compactacao = fator_compactacao
+        self._minimo_compactacao = minimo_compactacao
+        self._minimo_bytes_mortos = minimo_bytes_mortos
+        self._vivos = sum(registro[1] for registro in self._indice.values())
+        self._mapa = None
+        self._lock = threading.Lock()
+        self._remover_segmentos_orfaos()
+        if incompleto:
+            self._compactar()  # descarta a linha cortada antes de voltar a acrescentar
+        self._remapear()
+
+    def _carregar_indice(self):
+        # Reproduz o log: o último registro de cada vídeo vence; linha final incompleta é ignorada
+        registros = 0
+        if not os.path.exists(self._caminho_indice):
+            return registros, False
+        with open(self._caminho_indice) as f:
+            for linha in f:
+                if not linha.endswith("\n"):
+                    return registros, True
+                dados = json.loads(linha)
+                if len(dados) == 2:  # cabeçalho ["#segmento", nome]
+                    self._segmento = dados[1]
+                    continue
+                video_id, deslocamento, tamanho, expira_em = dados
+                self._indice[video_id] = [deslocamento, tamanho, expira_em]
+                registros += 1
+        return registros, False
+
+    def _remover_segmentos_orfaos(self):
+        # Sobras de uma compactação interrompida antes da troca do log
+        for nome in os.listdir(self._diretorio):
+            if nome.startswith("segmento") and nome.endswith(".dat") and nome != self._segmento:
+                os.remove(os.path.join(self._diretorio, nome))
+
+    def _remapear(self):
+        # Mapas antigos continuam vivos enquanto houver memoryviews apontando para eles
+        tamanho = os.fstat(self._arquivo.fileno()).st_size
+        self._mapa = mmap.mmap(self._arquivo.fileno(), tamanho, access=mmap.ACCESS_READ) if tamanho else None
+
+    def obter(self, video_id):
+        with self._lock:
+            posicao = self._indice.get(video_id)
+            if posicao is None:
+                return None
+            deslocamento, tamanho, expira_em = posicao
+            if expira_em is not None and expira_em <= time.time():
+                return None
+            if self._mapa is None or deslocamento + tamanho > len(self._mapa):
+                self._remapear()
+            mapa = self._mapa
+        return memoryview(mapa)[deslocamento:deslocamento + tamanho]
+
+    def expiracao(self, video_id):
+        # Instante (epoch) em que a entrada do disco expira, ou None
+        registro = self._indice.get(video_id)
+        return registro[2] if registro is not None else None
+
+    def guardar(self, video_id, conteudo, expira_em=None):
+        # expira_em usa o relógio de parede (time.time) para valer entre reinícios
+        with self._lock:
+            self._guardar(video_id, conteudo, expira_em)
+
+    def _guardar(self, video_id, conteudo, expira_em):
+        self._arquivo.seek(0, os.SEEK_END)
+        deslocamento = self._arquivo.tell()
+        self._arquivo.write(conteudo)
+        self._arquivo.flush()
+        anterior = self._indice.get(video_id)
+        if anterior is not None:
+            self._vivos -= anterior[1]
+        self._vivos += len(conteudo)
+        registro = [deslocamento, len(conteudo), expira_em]
+        self._indice[video_id] = registro
+        # Cada escrita só acrescenta uma linha ao log: O(1) em vez de reescrever o índice inteiro
+        self._log.write(json.dumps([video_id, *registro]) + "\n")
+        self._log.flush()
+        self._registros += 1
+        mortos = deslocamento + len(conteudo) - self._vivos
+        if mortos > max(self._minimo_bytes_mortos, self._fator_compactacao * self._vivos):
+            self._compactar(segmento=True)
+        elif self._registros > max(self._minimo_compactacao, self._fator_compactacao * len(self._indice)):
+            self._compactar()
+
+    def _compactar(self, segmento=False):
+        # Reescreve o log só com as entradas vivas (descarta substituídas e expiradas);
+        # com segmento=True copia também os conteúdos vivos para um segmento novo
+        agora = time.time()
+        self._indice = {video_id: registro for video_id, registro in self._indice.items()
+                        if registro[2] is None or registro[2] > agora}
+        nome_segmento = self._segmento
+        if segmento:
+            numero = int(nome_segmento[len("segmento-"):-len(".dat")]) + 1 \
+                if nome_segmento != "segmento.dat" else 1
+            nome_segmento = f"segmento-{numero}.dat"
+            self._remapear()
+            mapa = self._mapa
+            novo_indice = {}
+            with open(os.path.join(self._diretorio, nome_segmento), "wb") as f:
+                for video_id, (deslocamento, tamanho, expira_em) in self._indice.items():
+                    novo_indice[video_id] = [f.tell(), tamanho, expira_em]
+                    f.write(mapa[deslocamento:deslocamento + tamanho] if tamanho else b"")
+                f.flush()
+                os.fsync(f.fileno())
+            self._indice = novo_indice
+        temporario = self._caminho_indice + ".tmp"
+        with open(temporario, "w") as f:
+            f.write(json.dumps(["#segmento", nome_segmento]) + "\n")
+            for video_id, registro in self._indice.items():
+                f.write(json.dumps([video_id, *registro]) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._log.close()
+        os.replace(temporario, self._caminho_indice)
+        self._log = open(self._caminho_indice, "a")
+        self._registros = len(self._indice)
+        self._vivos = sum(registro[1] for registro in self._indice.values())
+        if segmento:
+            antigo, self._arquivo = self._arquivo, open(os.path.join(self._diretorio, nome_segmento), "a+b")
+            antigo.close()
+            os.remove(os.path.join(self._diretorio, self._segmento))
+            self._segmento = nome_segmento
+            self._remapear()
+
+    def fechar(self):
+        self._log.close()
+        self._arquivo.close()
+
+# Carga em andamento, compartilhada por quem pede o mesmo vídeo ao mesmo tempo
+class _CargaEmVoo:
     def __init__(self):
+        self.pronta = threading.Event()
+        self.conteudo = None
+        self.erro = None
+
+# Proxy com cache LRU/TTL, coalescência de falhas e nível opcional em disco
+class YoutubeProxy(ServicoVideo):
+    def __init__(self, capacidade=128, ttl=None, disco: CacheDisco = None):
         self._youtube = Youtube()
-        self._cache = {}
+        self._disco = disco
+        self._cache = OrderedDict()  # video_id -> (instante de expiração ou None, conteúdo)
+        self._capacidade = capacidade
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._em_voo = {}
+        self.estatisticas = {"acertos": 0, "acertos_disco": 0, "falhas": 0,
+                             "despejos": 0, "coalescidos": 0}
+
+    def _no_cache(self, video_id):
+        if video_id not in self._cache:
+            return False
+        expira_em, _ = self._cache[video_id]
+        if expira_em is not None and expira_em <= time.monotonic():
+            del self._cache[video_id]
+            return False
+        self._cache.move_to_end(video_id)
+        return True
+
+    def _guardar(self, video_id, conteudo, limite_disco=None):
+        # limite_disco: expiração (epoch) da cópia em disco; a memória não vive além dela
+        agora = time.monotonic()
+        expira_em = agora + self._ttl if self._ttl is not None else None
+        if limite_disco is not None:
+            limite = agora + (limite_disco - time.time())
+            expira_em = limite if expira_em is None else min(expira_em, limite)
+        self._cache[video_id] = (expira_em, conteudo)
+        self._cache.move_to_end(video_id)
+        while len(self._cache) > self._capacidade:
+            self._cache.popitem(last=False)
+            self.estatisticas["despejos"] += 1
 
     def assistir(self, video_id: str):
-        if video_id in self._cache:
+        with self._lock:
+            if self._no_cache(video_id):
+                self.estatisticas["acertos"] += 1
+                carga, lider = None, False
+                conteudo = self._cache[video_id][1]
+            elif video_id in self._em_voo:
+                self.estatisticas["coalescidos"] += 1
+                carga, lider = self._em_voo[video_id], False
+            else:
+                self.estatisticas["falhas"] += 1
+                carga, lider = _CargaEmVoo(), True
+                self._em_voo[video_id] = carga
+
+        if carga is None:
             print(f"✅ Vídeo {video_id} recuperado do cache.")
             print(f"▶️ Reproduzindo {video_id}")
+            return conteudo
+        elif lider:
+            try:
+                conteudo = self._disco.obter(video_id) if self._disco is not None else None
+                limite_disco = None
+                if conteudo is not None:
+                    limite_disco = self._disco.expiracao(video_id)
+                    self.estatisticas["acertos_disco"] += 1
+                    print(f"💾 Vídeo {video_id} recuperado do disco.")
+                    print(f"▶️ Reproduzindo {video_id}")
+                else:
+                    conteudo = self._youtube.assistir(video_id)
+                    if self._disco is not None:
+                        expira_em = time.time() + self._ttl if self._ttl is not None else None
+                        self._disco.guardar(video_id, conteudo, expira_em)
+                with self._lock:
+                    self._guardar(video_id, conteudo, limite_disco)
+                carga.conteudo = conteudo
+                return conteudo
+            except Exception as erro:
+                carga.erro = erro
+                raise
+            finally:
+                with self._lock:
+                    del self._em_voo[video_id]
+                carga.pronta.set()
         else:
-            self._youtube.assistir(video_id)
-            self._cache[video_id] = True
+            carga.pronta.wait()
+            if carga.erro is not None:
+                raise carga.erro
+            print(f"⏳ Vídeo {video_id} carregado por outra requisição.")
+            print(f"▶️ Reproduzindo {video_id}")
+            return carga.conteudo
 
 # Cliente
 def assistir_video(servico: ServicoVideo, video_id: str):
-    servico.assistir(video_id)
+    return servico.assistir(video_id)
 
 # Teste
 if __name__ == "__main__":
-    youtube = YoutubeProxy()
+    youtube = YoutubeProxy(capacidade=2, ttl=60)
     assistir_video(youtube, "Aula-01")
     print("\n---\n")
     assistir_video(youtube, "Aula-02")
     print("\n---\n")
     assistir_video(youtube, "Aula-01")  # este virá do cache
+
+    print("\n--- Três pedidos simultâneos de Aula-03 ---\n")
+    threads = [threading.Thread(target=assistir_video, args=(youtube, "Aula-03"))
+               for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    print(f"\n📊 Estatísticas: {youtube.estatisticas}")
+
+    print("\n--- Cache em disco sobrevive ao reinício ---\n")
+    diretorio = os.path.join(tempfile.mkdtemp(), "cache_videos")
+    disco = CacheDisco(diretorio)
+    assistir_video(YoutubeProxy(disco=disco), "Aula-04")
+    disco.fechar()
+
+    print("\n🔄 Reiniciando o proxy...\n")
+    disco = CacheDisco(diretorio)
+    conteudo = assistir_video(YoutubeProxy(disco=disco), "Aula-04")
+    print(f"📦 {bytes(conteudo).decode()} ({type(conteudo).__name__})")
+    del conteudo
+    disco.fechar()
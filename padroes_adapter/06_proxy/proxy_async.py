@@ -0,0 +1,165 @@
+from abc import ABC, abstractmethod
+import asyncio
+from collections import OrderedDict
+import re
+import time
+
+# Interface comum (assíncrona)
+class ServicoVideoAsync(ABC):
+    @abstractmethod
+    async def assistir(self, video_id: str): pass
+
+# Backend falso que substitui o YouTube: carrega vários vídeos por requisição
+class YoutubeFalso:
+    def __init__(self, latencia=0.05):
+        self._latencia = latencia
+        self.requisicoes = 0
+
+    async def carregar_lote(self, video_ids):
+        self.requisicoes += 1
+        await asyncio.sleep(self._latencia)  # simula tempo de rede
+        return {video_id: f"<conteúdo de {video_id}>" for video_id in video_ids}
+
+# Proxy assíncrono com agrupamento de falhas e pré-carregamento
+class YoutubeProxyAsync(ServicoVideoAsync):
+    def __init__(self, backend: YoutubeFalso, janela=0.005, tamanho_lote=64, prefetch=True,
+                 capacidade=1024, ttl_ausentes=30.0):
+        self._backend = backend
+        self._capacidade = capacidade
+        self._ttl_ausentes = ttl_ausentes
+        self._janela = janela
+        self._tamanho_lote = tamanho_lote
+        self._prefetch = prefetch
+        self._cache = OrderedDict()  # LRU limitado a `capacidade` vídeos
+        self._ausentes = OrderedDict()  # cache negativo: video_id -> validade da marca
+        self._pendentes = {}  # video_id -> Future compartilhado
+        self._lote = []
+        self._despacho = None
+        self._tarefas = set()
+        self.estatisticas = {"acertos": 0, "falhas": 0, "coalescidos": 0, "prefetch": 0,
+                             "despejos": 0, "ausentes": 0}
+
+    @staticmethod
+    def proximo_id(video_id: str):
+        # "Aula-01" -> "Aula-02"
+        achado = re.search(r"(\d+)$", video_id)
+        if achado is None:
+            return None
+        numero = achado.group(1)
+        return video_id[:achado.start()] + str(int(numero) + 1).zfill(len(numero))
+
+    def _agendar(self, video_id):
+        futuro = asyncio.get_running_loop().create_future()
+        self._pendentes[video_id] = futuro
+        self._lote.append(video_id)
+        if len(self._lote) >= self._tamanho_lote:
+            self._disparar_lote()
+        elif self._despacho is None:
+            self._despacho = asyncio.get_running_loop().call_later(self._janela, self._disparar_lote)
+        return futuro
+
+    def _disparar_lote(self):
+        if self._despacho is not None:
+            self._despacho.cancel()
+            self._despacho = None
+        lote, self._lote = self._lote, []
+        if lote:
+            tarefa = asyncio.ensure_future(self._carregar(lote))
+            self._tarefas.add(tarefa)
+            tarefa.add_done_callback(self._tarefas.discard)
+
+    async def _carregar(self, lote):
+        try:
+            conteudos = await self._backend.carregar_lote(lote)
+        except Exception as erro:
+            for video_id in lote:
+                futuro = self._pendentes.pop(video_id)
+                if not futuro.done():
+                    futuro.set_exception(erro)
+            return
+        for video_id in lote:
+            futuro = self._pendentes.pop(video_id)
+            conteudo = conteudos.get(video_id)
+            if conteudo is None:
+                # Ids que o backend omitiu falham e não vão para o cache
+                self.estatisticas["ausentes"] += 1
+                self._marcar_ausente(video_id)
+                if not futuro.done():
+                    futuro.set_exception(KeyError(video_id))
+                continue
+            self._guardar(video_id, conteudo)
+            if not futuro.done():
+                futuro.set_result(conteudo)
+
+    def _marcar_ausente(self, video_id):
+        self._ausentes[video_id] = time.monotonic() + self._ttl_ausentes
+        self._ausentes.move_to_end(video_id)
+        while len(self._ausentes) > self._capacidade:
+            self._ausentes.popitem(last=False)
+
+    def _sabidamente_ausente(self, video_id):
+        expira_em = self._ausentes.get(video_id)
+        if expira_em is None:
+            return False
+        if expira_em <= time.monotonic():
+            del self._ausentes[video_id]
+            return False
+        return True
+
+    def _guardar(self, video_id, conteudo):
+        self._cache[video_id] = conteudo
+        self._cache.move_to_end(video_id)
+        while len(self._cache) > self._capacidade:
+            self._cache.popitem(last=False)
+            self.estatisticas["despejos"] += 1
+
+    def _pre_carregar(self, video_id):
+        proximo = self.proximo_id(video_id)
+        if (proximo is not None and proximo not in self._cache and proximo not in self._pendentes
+                and not self._sabidamente_ausente(proximo)):
+            self.estatisticas["prefetch"] += 1
+            futuro = self._agendar(proximo)
+            futuro.add_done_callback(lambda f: f.cancelled() or f.exception())  # ninguém aguarda o prefetch
+
+    async def assistir(self, video_id: str):
+        if video_id in self._cache:
+            self.estatisticas["acertos"] += 1
+            self._cache.move_to_end(video_id)
+            conteudo = self._cache[video_id]
+        elif self._sabidamente_ausente(video_id):
+            # Cache negativo: o backend acabou de dizer que este id não existe
+            self.estatisticas["ausentes"] += 1
+            raise KeyError(video_id)
+        else:
+            futuro = self._pendentes.get(video_id)
+            if futuro is not None:
+                self.estatisticas["coalescidos"] += 1
+            else:
+                self.estatisticas["falhas"] += 1
+                futuro = self._agendar(video_id)
+            conteudo = await asyncio.shield(futuro)
+        if self._prefetch:
+            self._pre_carregar(video_id)
+        return conteudo
+
+# Cliente
+async def assistir_video(servico: ServicoVideoAsync, video_id: str):
+    return await servico.assistir(video_id)
+
+# Teste
+async def main():
+    backend = YoutubeFalso(latencia=0.05)
+    proxy = YoutubeProxyAsync(backend)
+
+    ids = [f"Aula-{i % 200:02d}" for i in range(5000)]
+    inicio = time.perf_counter()
+    await asyncio.gather(*(assistir_video(proxy, video_id) for video_id in ids))
+    duracao = time.perf_counter() - inicio
+    print(f"🎬 {len(ids)} chamadas em {duracao:.3f}s com {backend.requisicoes} requisições ao backend")
+
+    await asyncio.sleep(0.1)  # deixa o prefetch de Aula-200 terminar
+    print(f"▶️ {await assistir_video(proxy, 'Aula-200')} (veio do prefetch)")
+    print(f"\n📊 Estatísticas: {proxy.estatisticas}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,7 +1,11 @@
 from abc import ABC, abstractmethod
+import time
 
 # Handler base
 class Suporte(ABC):
+    # Problemas que o manipulador declara tratar (usados para compilar a cadeia)
+    problemas = frozenset()
+
     def __init__(self):
         self._proximo = None
 
@@ -9,37 +13,101 @@ class Suporte(ABC):
         self._proximo = proximo
         return proximo
 
+    def pode_tratar(self, problema: str):
+        # Sobrescreva para manipuladores baseados em predicado
+        return problema in self.problemas
+
     @abstractmethod
-    def tratar(self, problema: str):
+    def resolver(self, problema: str):
         pass
 
-# Manipuladores concretos
-class Atendente(Suporte):
+    def recusar(self, problema: str):
+        print(f"❌ {type(self).__name__}: Não consigo resolver.")
+
     def tratar(self, problema: str):
-        if problema == "senha":
-            print("🔧 Atendente: Resolvi o problema de senha.")
+        if self.pode_tratar(problema):
+            self.resolver(problema)
         elif self._proximo:
-            print("↪️ Atendente: Encaminhando para o Supervisor...")
+            print(f"↪️ {type(self).__name__}: Encaminhando para o {type(self._proximo).__name__}...")
             self._proximo.tratar(problema)
         else:
-            print("❌ Atendente: Não consigo resolver.")
+            self.recusar(problema)
+
+# Manipuladores concretos
+class Atendente(Suporte):
+    problemas = frozenset({"senha"})
+
+    def resolver(self, problema: str):
+        print("🔧 Atendente: Resolvi o problema de senha.")
 
 class Supervisor(Suporte):
-    def tratar(self, problema: str):
-        if problema == "rede":
-            print("🛠️ Supervisor: Resolvi o problema de rede.")
-        elif self._proximo:
-            print("↪️ Supervisor: Encaminhando para o Gerente...")
-            self._proximo.tratar(problema)
-        else:
-            print("❌ Supervisor: Não consigo resolver.")
+    problemas = frozenset({"rede"})
+
+    def resolver(self, problema: str):
+        print("🛠️ Supervisor: Resolvi o problema de rede.")
 
 class Gerente(Suporte):
+    problemas = frozenset({"servidor"})
+
+    def resolver(self, problema: str):
+        print("🚨 Gerente: Resolvi o problema no servidor.")
+
+    def recusar(self, problema: str):
+        print("❌ Gerente: Problema não identificado.")
+
+# Manipulador baseado em predicado (não cabe numa tabela)
+class EspecialistaBanco(Suporte):
+    def pode_tratar(self, problema: str):
+        return problema.startswith("banco")
+
+    def resolver(self, problema: str):
+        print(f"🗄️ EspecialistaBanco: Resolvi o problema '{problema}'.")
+
+# Cadeia compilada: tabela problema -> manipulador, com a cadeia linear como reserva
+class CadeiaCompilada:
+    def __init__(self, primeiro: Suporte):
+        self._manipuladores = []
+        manipulador = primeiro
+        while manipulador is not None:
+            self._manipuladores.append(manipulador)
+            manipulador = manipulador._proximo
+
+        self._tabela = {}       # problema -> (posição na cadeia, manipulador)
+        self._predicados = []   # (posição, manipulador) com pode_tratar próprio
+        for posicao, manipulador in enumerate(self._manipuladores):
+            if type(manipulador).pode_tratar is not Suporte.pode_tratar:
+                self._predicados.append((posicao, manipulador))
+            for problema in manipulador.problemas:
+                self._tabela.setdefault(problema, (posicao, manipulador))
+
+        # Um contador por posição: duas instâncias da mesma classe não se misturam
+        self._contadores = [{"acertos": 0, "segundos": 0.0} for _ in self._manipuladores]
+        self.estatisticas = {f"{posicao}:{type(m).__name__}": contador for posicao, (m, contador)
+                             in enumerate(zip(self._manipuladores, self._contadores))}
+        self.estatisticas["sem_tratamento"] = {"acertos": 0, "segundos": 0.0}
+
     def tratar(self, problema: str):
-        if problema == "servidor":
-            print("🚨 Gerente: Resolvi o problema no servidor.")
-        else:
-            print("❌ Gerente: Problema não identificado.")
+        entrada = self._tabela.get(problema)
+        limite = entrada[0] if entrada else len(self._manipuladores)
+        # Predicados que vêm antes na cadeia têm prioridade sobre a tabela
+        for posicao, manipulador in self._predicados:
+            if posicao >= limite:
+                break
+            if manipulador.pode_tratar(problema):
+                return self._executar(posicao, manipulador, problema)
+        if entrada is not None:
+            return self._executar(*entrada, problema)
+        self.estatisticas["sem_tratamento"]["acertos"] += 1
+        self._manipuladores[-1].recusar(problema)
+
+    def _executar(self, posicao, manipulador: Suporte, problema: str):
+        inicio = time.perf_counter()
+        try:
+            return manipulador.resolver(problema)
+        finally:
+            contador = self._contadores[posicao]
+            contador["acertos"] += 1
+            contador["segundos"] += time.perf_counter() - inicio
 
 # Cliente
 if __name__ == "__main__":
@@ -60,3 +128,14 @@ if __name__ == "__main__":
 
     print("\nChamado: problema desconhecido")
     atendente.tratar("hack")
+
+    print("\n--- Cadeia compilada ---")
+    atendente.definir_proximo(EspecialistaBanco()).definir_proximo(supervisor)
+    cadeia = CadeiaCompilada(atendente)
+    for problema in ("servidor", "banco-lento", "senha", "rede", "hack"):
+        print(f"\nChamado: {problema}")
+        cadeia.tratar(problema)
+
+    print("\n📊 Onde o tráfego caiu:")
+    for nome, contador in cadeia.estatisticas.items():
+        print(f"  {nome}: {contador['acertos']} chamados, {contador['segundos'] * 1000:.3f} ms")
@@ -0,0 +1,129 @@
+from abc import ABC, abstractmethod
+import asyncio
+import time
+
+# Handler base (assíncrono)
+class SuporteAsync(ABC):
+    def __init__(self, timeout=1.0):
+        self._proximo = None
+        self.timeout = timeout  # limite para cada chamada a este manipulador
+
+    def definir_proximo(self, proximo):
+        self._proximo = proximo
+        return proximo
+
+    @abstractmethod
+    async def pode_tratar(self, problema: str): pass
+
+    @abstractmethod
+    async def resolver(self, problema: str): pass
+
+# Manipuladores concretos: cada consulta simula uma chamada de I/O
+class AtendenteAsync(SuporteAsync):
+    async def pode_tratar(self, problema: str):
+        await asyncio.sleep(0.05)
+        return problema == "senha"
+
+    async def resolver(self, problema: str):
+        await asyncio.sleep(0.05)
+        return "🔧 Atendente: Resolvi o problema de senha."
+
+class SupervisorAsync(SuporteAsync):
+    async def pode_tratar(self, problema: str):
+        await asyncio.sleep(0.1)
+        return problema == "rede"
+
+    async def resolver(self, problema: str):
+        await asyncio.sleep(0.1)
+        return "🛠️ Supervisor: Resolvi o problema de rede."
+
+class GerenteAsync(SuporteAsync):
+    async def pode_tratar(self, problema: str):
+        await asyncio.sleep(0.2)
+        return problema == "servidor"
+
+    async def resolver(self, problema: str):
+        await asyncio.sleep(0.2)
+        return "🚨 Gerente: Resolvi o problema no servidor."
+
+class AuditoriaLenta(SuporteAsync):
+    async def pode_tratar(self, problema: str):
+        await asyncio.sleep(10)  # nunca responde a tempo
+        return True
+
+    async def resolver(self, problema: str):
+        return "🕵️ Auditoria: Resolvido."
+
+# Resultado de uma sondagem que não respondeu a tempo (diferente de "não sei tratar")
+TEMPO_ESGOTADO = object()
+
+# Cadeia assíncrona: sondagens especulativas em paralelo, vence o primeiro "sim" na ordem da cadeia
+class CadeiaAsync:
+    def __init__(self, primeiro: SuporteAsync, especulativo=True):
+        self._manipuladores = []
+        manipulador = primeiro
+        while manipulador is not None:
+            self._manipuladores.append(manipulador)
+            manipulador = manipulador._proximo
+        self._especulativo = especulativo
+
+    @staticmethod
+    async def _sondar(manipulador: SuporteAsync, problema: str):
+        # Só o timeout vira um marcador; erros do manipulador sobem para quem chamou
+        try:
+            return await asyncio.wait_for(manipulador.pode_tratar(problema), manipulador.timeout)
+        except asyncio.TimeoutError:
+            return TEMPO_ESGOTADO
+
+    async def tratar(self, problema: str):
+        if self._especulativo:
+            sondagens = [asyncio.ensure_future(self._sondar(m, problema)) for m in self._manipuladores]
+        else:
+            sondagens = [self._sondar(m, problema) for m in self._manipuladores]
+        esgotados = []
+        try:
+            for manipulador, sondagem in zip(self._manipuladores, sondagens):
+                resposta = await sondagem
+                if resposta is TEMPO_ESGOTADO:
+                    esgotados.append(type(manipulador).__name__)
+                    continue
+                if not resposta:
+                    continue
+                try:
+                    return await asyncio.wait_for(manipulador.resolver(problema), manipulador.timeout)
+                except asyncio.TimeoutError:
+                    print(f"⏰ {type(manipulador).__name__}: tempo esgotado, seguindo na cadeia...")
+                    esgotados.append(type(manipulador).__name__)
+            if esgotados:
+                # Alguém talvez soubesse tratar, mas não respondeu: não é um "não" definitivo
+                return f"⏰ Sem resposta a tempo de: {', '.join(esgotados)}."
+            return "❌ Problema não identificado."
+        finally:
+            for sondagem in sondagens:
+                if isinstance(sondagem, asyncio.Future):
+                    if sondagem.done() and not sondagem.cancelled():
+                        sondagem.exception()  # já tratada acima ou abandonada; evita o aviso do asyncio
+                    sondagem.cancel()
+                else:
+                    sondagem.close()
+
+# Cliente
+async def main():
+    atendente = AtendenteAsync()
+    atendente.definir_proximo(SupervisorAsync()) \
+        .definir_proximo(AuditoriaLenta(timeout=0.3)) \
+        .definir_proximo(GerenteAsync())
+
+    for especulativo in (False, True):
+        cadeia = CadeiaAsync(atendente, especulativo=especulativo)
+        chamados = ["senha", "rede", "servidor", "hack"] * 250
+        inicio = time.perf_counter()
+        respostas = await asyncio.gather(*(cadeia.tratar(p) for p in chamados))
+        duracao = time.perf_counter() - inicio
+        modo = "especulativo" if especulativo else "sequencial"
+        print(f"\n⚙️ Modo {modo}: {len(chamados)} chamados em {duracao:.2f}s")
+        for resposta in respostas[:4]:
+            print(f"  {resposta}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,7 +1,18 @@
 from abc import ABC, abstractmethod
+from collections import deque
+import heapq
+import itertools
+import json
+import os
+import tempfile
+import threading
+import time
 
 # Receiver (quem executa as ações reais)
 class Luz:
+    def __init__(self, nome="sala"):
+        self.nome = nome
+
     def ligar(self):
         print("💡 Luz ligada")
 
@@ -13,30 +24,297 @@ class Comando(ABC):
     @abstractmethod
     def executar(self): pass
 
-# Concrete Commands
-class LigarLuz(Comando):
+    @property
+    def receptor(self):
+        # Usado pelo ControleAssincrono para ordenar e agrupar; sem receptor conhecido,
+        # cada comando é independente
+        return self
+
+    def serializar(self):
+        raise NotImplementedError(f"{type(self).__name__} não pode ser gravado no diário")
+
+# Comandos sobre uma Luz: receptor e serialização vêm da própria luz
+class ComandoLuz(Comando):
     def __init__(self, luz: Luz):
         self.luz = luz
 
+    @property
+    def receptor(self):
+        return self.luz
+
+    def serializar(self):
+        return {"tipo": type(self).__name__, "luz": self.luz.nome}
+
+# Concrete Commands
+class LigarLuz(ComandoLuz):
     def executar(self):
         self.luz.ligar()
 
-class DesligarLuz(Comando):
-    def __init__(self, luz: Luz):
-        self.luz = luz
-
+class DesligarLuz(ComandoLuz):
     def executar(self):
         self.luz.desligar()
 
+COMANDOS = {"LigarLuz": LigarLuz, "DesligarLuz": DesligarLuz}
+
+# Diário em disco (append-only) com group commit: um fsync cobre vários comandos
+class DiarioComandos:
+    def __init__(self, caminho, intervalo_fsync=0.05, tamanho_lote=256, limite_registros=None):
+        # limite_registros: ao passar disso, o diário é compactado automaticamente
+        self.caminho = caminho
+        self._no_arquivo = self._reparar(caminho)
+        self._arquivo = open(caminho, "a", encoding="utf-8")
+        self._lock_arquivo = threading.Lock()
+        self._intervalo = intervalo_fsync
+        self._tamanho_lote = tamanho_lote
+        self._limite_registros = limite_registros
+        self._pendentes = []
+        self._condicao = threading.Condition()
+        self._registrados = 0  # registros recebidos
+        self._duraveis = 0     # registros já cobertos por um fsync
+        self._aguardando = 0   # quem espera durabilidade antecipa o próximo fsync
+        self._aberto = True
+        self.fsyncs = 0
+        self.compactacoes = 0
+        self._thread = threading.Thread(target=self._gravar, daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _reparar(caminho, tamanho_bloco=64 * 1024):
+        # Corta o registro incompleto deixado por uma queda, para que as próximas
+        # linhas não sejam coladas nele; devolve quantos registros completos existem
+        try:
+            arquivo = open(caminho, "r+b")
+        except FileNotFoundError:
+            return 0
+        with arquivo:
+            registros = fim = posicao = 0
+            while bloco := arquivo.read(tamanho_bloco):
+                quebras = bloco.count(b"\n")
+                if quebras:
+                    registros += quebras
+                    fim = posicao + bloco.rindex(b"\n") + 1
+                posicao += len(bloco)
+            if fim < posicao:
+                arquivo.truncate(fim)
+                arquivo.flush()
+                os.fsync(arquivo.fileno())
+        return registros
+
+    def registrar(self, comando: Comando, aguardar=False):
+        # aguardar=True só retorna depois que o registro estiver em disco
+        linha = json.dumps(comando.serializar()) + "\n"
+        with self._condicao:
+            if not self._aberto:
+                raise RuntimeError("DiarioComandos já foi fechado")
+            self._pendentes.append(linha)
+            self._registrados += 1
+            numero = self._registrados
+            if aguardar:
+                self._aguardando += 1
+                self._condicao.notify_all()
+                self._condicao.wait_for(lambda: self._duraveis >= numero)
+                self._aguardando -= 1
+            elif len(self._pendentes) >= self._tamanho_lote:
+                self._condicao.notify_all()
+
+    def _gravar(self):
+        while True:
+            with self._condicao:
+                self._condicao.wait_for(
+                    lambda: len(self._pendentes) >= self._tamanho_lote or not self._aberto
+                    or (self._pendentes and self._aguardando),
+                    timeout=self._intervalo)
+                lote, self._pendentes = self._pendentes, []
+                encerrar = not self._aberto
+            if lote:
+                with self._lock_arquivo:
+                    self._arquivo.writelines(lote)
+                    self._arquivo.flush()
+                    os.fsync(self._arquivo.fileno())
+                    self._no_arquivo += len(lote)
+                with self._condicao:
+                    self.fsyncs += 1
+                    self._duraveis += len(lote)
+                    self._condicao.notify_all()
+                if self._limite_registros is not None and self._no_arquivo > self._limite_registros:
+                    self.compactar()
+            if encerrar:
+                return
+
+    def compactar(self):
+        # Ligar/desligar definem estado: basta o último comando de cada receptor
+        with self._lock_arquivo:
+            ultimos = {}
+            with open(self.caminho, encoding="utf-8") as arquivo:
+                for linha in arquivo:
+                    luz = json.loads(linha)["luz"]
+                    ultimos.pop(luz, None)  # mantém a ordem da última ocorrência
+                    ultimos[luz] = linha
+            temporario = self.caminho + ".tmp"
+            with open(temporario, "w", encoding="utf-8") as arquivo:
+                arquivo.writelines(ultimos.values())
+                arquivo.flush()
+                os.fsync(arquivo.fileno())
+            self._arquivo.close()
+            os.replace(temporario, self.caminho)
+            self._arquivo = open(self.caminho, "a", encoding="utf-8")
+            self._no_arquivo = len(ultimos)
+            self.compactacoes += 1
+
+    def reproduzir(self, receptores):
+        # receptores: nome da luz -> Luz
+        with open(self.caminho, encoding="utf-8") as arquivo:
+            for linha in arquivo:
+                if not linha.endswith("\n"):
+                    break  # registro incompleto de uma queda durante a escrita
+                dados = json.loads(linha)
+                yield COMANDOS[dados["tipo"]](receptores[dados["luz"]])
+
+    def fechar(self):
+        with self._condicao:
+            self._aberto = False
+            self._condicao.notify_all()
+        self._thread.join()
+        self._arquivo.close()
+
 # Invoker
 class ControleRemoto:
-    def __init__(self):
-        self._historico = []
+    def __init__(self, capacidade_historico=1000, diario: DiarioComandos = None):
+        # Buffer circular: só os últimos comandos ficam em memória
+        self._historico = deque(maxlen=capacidade_historico)
+        self._diario = diario
 
     def executar_comando(self, comando: Comando):
         self._historico.append(comando)
+        if self._diario is not None:
+            self._diario.registrar(comando)
         comando.executar()
 
+    def reproduzir(self, diario: DiarioComandos, receptores):
+        # Recupera o estado na inicialização sem voltar a registrar no diário
+        for comando in diario.reproduzir(receptores):
+            self._historico.append(comando)
+            comando.executar()
+
+# Invoker assíncrono: fila de prioridade por trabalhador, comandos do mesmo
+# receptor sempre vão para o mesmo trabalhador (a ordem entre eles é mantida)
+class _Trabalhador:
+    def __init__(self, controle):
+        self.fila = []
+        self._controle = controle
+        self.thread = threading.Thread(target=self._executar, daemon=True)
+        self.thread.start()
+
+    def _executar(self):
+        controle = self._controle
+        condicao = controle._condicao
+        while True:
+            with condicao:
+                condicao.wait_for(lambda: self.fila or not controle._aberto)
+                if not self.fila:
+                    return
+                # Agrupa comandos consecutivos que miram o mesmo receptor
+                lote = [heapq.heappop(self.fila)]
+                receptor = lote[0][2].receptor
+                while (self.fila and len(lote) < controle._tamanho_lote
+                       and self.fila[0][2].receptor is receptor):
+                    lote.append(heapq.heappop(self.fila))
+            comandos = [item[2] for item in lote]
+            if controle._coalescer:
+                # Comandos de estado: só o último do lote define o resultado
+                comandos = comandos[-1:]
+            erros = []
+            try:
+                for comando in comandos:
+                    try:
+                        comando.executar()
+                    except Exception as erro:
+                        erros.append(erro)
+            finally:
+                # Mesmo com falha, o lote sai de _pendentes (senão aguardar() trava)
+                agora = time.perf_counter()
+                with condicao:
+                    controle._latencias_execucao.extend(agora - item[3] for item in lote)
+                    controle.coalescidos += len(lote) - 1 if controle._coalescer else 0
+                    controle.lotes += 1
+                    controle.erros += len(erros)
+                    if erros:
+                        controle.ultimo_erro = erros[-1]
+                    controle._pendentes -= len(lote)
+                    condicao.notify_all()
+
+class ControleAssincrono:
+    def __init__(self, trabalhadores=4, tamanho_lote=64, coalescer=False, amostras=10_000):
+        self._tamanho_lote = tamanho_lote
+        self._coalescer = coalescer
+        self._condicao = threading.Condition()
+        self._sequencia = itertools.count()
+        self._aberto = True
+        self._pendentes = 0
+        self._latencias_envio = deque(maxlen=amostras)
+        self._latencias_execucao = deque(maxlen=amostras)
+        self.coalescidos = 0
+        self.lotes = 0
+        self.erros = 0
+        self.ultimo_erro = None
+        self._trabalhadores = [_Trabalhador(self) for _ in range(trabalhadores)]
+
+    def enviar(self, comando: Comando, prioridade=0):
+        # Menor número = mais prioritário; não espera a execução
+        inicio = time.perf_counter()
+        trabalhador = self._trabalhadores[hash(comando.receptor) % len(self._trabalhadores)]
+        with self._condicao:
+            if not self._aberto:
+                raise RuntimeError("ControleAssincrono já foi fechado")
+            heapq.heappush(trabalhador.fila, (prioridade, next(self._sequencia), comando, inicio))
+            self._pendentes += 1
+            self._condicao.notify_all()
+            self._latencias_envio.append(time.perf_counter() - inicio)
+
+    def aguardar(self):
+        with self._condicao:
+            self._condicao.wait_for(lambda: self._pendentes == 0)
+
+    def fechar(self):
+        with self._condicao:
+            self._aberto = False
+            self._condicao.notify_all()
+        for trabalhador in self._trabalhadores:
+            trabalhador.thread.join()
+
+    @staticmethod
+    def _percentis(amostras):
+        amostras = sorted(amostras)
+        if not amostras:
+            return {}
+        return {"p50": amostras[len(amostras) // 2],
+                "p99": amostras[min(len(amostras) - 1, int(len(amostras) * 0.99))]}
+
+    def estatisticas(self):
+        with self._condicao:
+            return {
+                "envio": self._percentis(self._latencias_envio),
+                "execucao": self._percentis(self._latencias_execucao),
+                "lotes": self.lotes,
+                "coalescidos": self.coalescidos,
+                "erros": self.erros,
+            }
+
+# Receiver silencioso (para rajadas grandes)
+class LuzContador(Luz):
+    def __init__(self, nome="sala"):
+        super().__init__(nome)
+        self.acionamentos = 0
+        self.ligada = False
+
+    def ligar(self):
+        self.acionamentos += 1
+        self.ligada = True
+
+    def desligar(self):
+        self.acionamentos += 1
+        self.ligada = False
+
 # Cliente
 if __name__ == "__main__":
     luz_sala = Luz()
@@ -47,3 +325,38 @@ if __name__ == "__main__":
     controle = ControleRemoto()
     controle.executar_comando(comando_ligar)
     controle.executar_comando(comando_desligar)
+
+    print("\n--- Diário persistente com group commit ---")
+    caminho = os.path.join(tempfile.mkdtemp(), "comandos.log")
+    diario = DiarioComandos(caminho)
+    controle = ControleRemoto(capacidade_historico=3, diario=diario)
+    for _ in range(2):
+        controle.executar_comando(comando_ligar)
+        controle.executar_comando(comando_desligar)
+    diario.fechar()
+    print(f"🧾 Histórico em memória: {len(controle._historico)} | fsyncs: {diario.fsyncs}")
+
+    with open(caminho, "a", encoding="utf-8") as arquivo:
+        arquivo.write('{"tipo": "Liga')  # queda no meio de uma escrita
+
+    print("\n🔄 Reiniciando, compactando e reproduzindo o diário...")
+    diario = DiarioComandos(caminho)
+    diario.compactar()
+    recuperado = ControleRemoto(diario=diario)
+    recuperado.reproduzir(diario, {"sala": Luz("sala")})
+    diario.fechar()
+
+    print("\n--- Invoker assíncrono com prioridade e lotes ---")
+    assincrono = ControleAssincrono(trabalhadores=4, coalescer=True)
+    luzes = [LuzContador(f"luz-{i}") for i in range(8)]
+    for i in range(5000):
+        luz = luzes[i // 250 % len(luzes)]  # rajadas de 250 comandos por luz
+        comando = LigarLuz(luz) if i % 3 else DesligarLuz(luz)
+        assincrono.enviar(comando, prioridade=0 if i % 10 == 0 else 1)
+    assincrono.aguardar()
+    assincrono.fechar()
+
+    estatisticas = assincrono.estatisticas()
+    print(f"📨 Envio p99: {estatisticas['envio']['p99'] * 1e6:.1f} µs | "
+          f"execução p99: {estatisticas['execucao']['p99'] * 1000:.2f} ms")
+    print(f"📦 Lotes: {estatisticas['lotes']} | comandos coalescidos: {estatisticas['coalescidos']}")
@@ -1,3 +1,8 @@
+from bisect import bisect_left, insort
+import mmap
+import os
+import tempfile
+
 # Iterator
 class FuncionarioIterator:
     def __init__(self, funcionarios):
@@ -17,15 +22,191 @@ class FuncionarioIterator:
 
 # Coleção
 class Departamento:
-    def __init__(self):
+    def __init__(self, ordenado=False):
         self._funcionarios = []
+        self.ordenado = ordenado  # mantém os nomes em ordem, permitindo busca binária
 
     def adicionar(self, nome):
-        self._funcionarios.append(nome)
+        if self.ordenado:
+            insort(self._funcionarios, nome)
+        else:
+            self._funcionarios.append(nome)
 
     def __iter__(self):
         return FuncionarioIterator(self._funcionarios)
 
+    def com_prefixo(self, prefixo):
+        funcionarios = self._funcionarios
+        posicao = bisect_left(funcionarios, prefixo)
+        while posicao < len(funcionarios) and funcionarios[posicao].startswith(prefixo):
+            yield funcionarios[posicao]
+            posicao += 1
+
+    def consulta(self):
+        return Consulta(self)
+
+# Iterator sobre lotes: decodifica um bloco por vez, não o arquivo inteiro
+class FuncionarioIteratorEmLotes:
+    def __init__(self, lotes):
+        self._lotes = lotes
+        self._nomes = []
+        self._posicao = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while self._posicao >= len(self._nomes):
+            lote = next(self._lotes)  # StopIteration encerra a iteração
+            # split("\n") e não splitlines(): nomes podem conter \r, \x0b, \u2028...
+            self._nomes = str(lote, "utf-8").split("\n")
+            if self._nomes[-1] == "":
+                self._nomes.pop()  # todo lote termina em "\n"
+            self._posicao = 0
+        nome = self._nomes[self._posicao]
+        self._posicao += 1
+        return nome
+
+# Coleção em disco: um nome por linha, lido via mmap sob demanda
+class DepartamentoArquivo:
+    def __init__(self, caminho, ordenado=False):
+        self.caminho = caminho
+        self.ordenado = ordenado  # o arquivo já está em ordem (quem escreve garante)
+        # Leitura e escrita em descritores separados, cada um aberto só quando preciso
+        self._leitor = None
+        self._escritor = None
+        self._mapa = None
+
+    def _mapear(self):
+        if self._leitor is None:
+            try:
+                self._leitor = open(self.caminho, "rb")
+            except FileNotFoundError:
+                return None
+        tamanho = os.fstat(self._leitor.fileno()).st_size
+        if self._mapa is None or len(self._mapa) != tamanho:
+            # Mapas antigos seguem vivos enquanto houver memoryviews sobre eles
+            self._mapa = mmap.mmap(self._leitor.fileno(), tamanho, access=mmap.ACCESS_READ) if tamanho else None
+        return self._mapa
+
+    def adicionar(self, nome):
+        if self._escritor is None:
+            self._escritor = open(self.caminho, "ab")
+        self._escritor.write(nome.encode("utf-8") + b"\n")
+        self._escritor.flush()
+
+    def lotes(self, tamanho_bloco=1 << 20):
+        # Fatias memoryview (sem cópia) que terminam sempre em fim de linha
+        mapa = self._mapear()
+        if mapa is None:
+            return
+        visao = memoryview(mapa)
+        total = len(mapa)
+        inicio = 0
+        while inicio < total:
+            fim = min(inicio + tamanho_bloco, total)
+            if fim < total:
+                quebra = mapa.rfind(b"\n", inicio, fim)
+                if quebra == -1:
+                    quebra = mapa.find(b"\n", fim)
+                fim = total if quebra == -1 else quebra + 1
+            yield visao[inicio:fim]
+            inicio = fim
+
+    def __iter__(self):
+        return FuncionarioIteratorEmLotes(self.lotes())
+
+    def com_prefixo(self, prefixo):
+        # Busca binária por posição em bytes, alinhando cada ponto ao início da linha
+        mapa = self._mapear()
+        if mapa is None:
+            return
+        alvo = prefixo.encode("utf-8")
+        total = len(mapa)
+        baixo, alto = 0, total
+        while baixo < alto:
+            inicio = mapa.rfind(b"\n", 0, (baixo + alto) // 2) + 1
+            fim = mapa.find(b"\n", inicio)
+            fim = total if fim == -1 else fim
+            if mapa[inicio:fim] < alvo:
+                baixo = fim + 1
+            else:
+                alto = inicio
+        while baixo < total:
+            fim = mapa.find(b"\n", baixo)
+            fim = total if fim == -1 else fim
+            linha = mapa[baixo:fim]
+            if not linha.startswith(alvo):
+                return
+            yield linha.decode("utf-8")
+            baixo = fim + 1
+
+    def consulta(self):
+        return Consulta(self)
+
+    def fechar(self):
+        for arquivo in (self._leitor, self._escritor):
+            if arquivo is not None:
+                arquivo.close()
+
+# Pipeline preguiçoso: as etapas são acumuladas e executadas numa única passada
+FILTRAR, MAPEAR, PEGAR = "filtrar", "mapear", "pegar"
+
+class Consulta:
+    def __init__(self, fonte, etapas=(), prefixo=None):
+        self._fonte = fonte
+        self._etapas = etapas
+        self._prefixo = prefixo
+
+    def _com(self, etapa):
+        return Consulta(self._fonte, self._etapas + (etapa,), self._prefixo)
+
+    def filtrar(self, predicado):
+        return self._com((FILTRAR, predicado))
+
+    def com_prefixo(self, prefixo):
+        # Empurrado para a fonte quando ela é ordenada e é a primeira etapa
+        if not self._etapas and self._prefixo is None and getattr(self._fonte, "ordenado", False):
+            return Consulta(self._fonte, (), prefixo)
+        return self.filtrar(lambda nome: nome.startswith(prefixo))
+
+    def mapear(self, funcao):
+        return self._com((MAPEAR, funcao))
+
+    def pegar(self, quantidade):
+        return self._com((PEGAR, quantidade))
+
+    def __iter__(self):
+        if self._prefixo is not None:
+            itens = self._fonte.com_prefixo(self._prefixo)
+        else:
+            itens = iter(self._fonte)
+        etapas = self._etapas
+        pegos = [0] * len(etapas)
+        if any(tipo == PEGAR and argumento <= 0 for tipo, argumento in etapas):
+            return
+        for item in itens:
+            esgotado = False
+            for indice, (tipo, argumento) in enumerate(etapas):
+                if tipo == FILTRAR:
+                    if not argumento(item):
+                        break
+                elif tipo == MAPEAR:
+                    item = argumento(item)
+                else:
+                    pegos[indice] += 1
+                    esgotado = esgotado or pegos[indice] == argumento
+            else:
+                yield item
+            if esgotado:
+                return
+
+    def agrupar(self, chave):
+        grupos = {}
+        for item in self:
+            grupos.setdefault(chave(item), []).append(item)
+        return grupos
+
 # Cliente
 if __name__ == "__main__":
     ti = Departamento()
@@ -36,3 +217,30 @@ if __name__ == "__main__":
     print("Funcionários do TI:")
     for funcionario in ti:
         print(f"👤 {funcionario}")
+
+    print("\nFuncionários do cadastro em disco:")
+    caminho = os.path.join(tempfile.mkdtemp(), "funcionarios.txt")
+    cadastro = DepartamentoArquivo(caminho)
+    for nome in ("Alice", "Bruno", "Carla", "Diego", "Elisa"):
+        cadastro.adicionar(nome)
+
+    for funcionario in cadastro:
+        print(f"👤 {funcionario}")
+
+    blocos = [len(lote) for lote in cadastro.lotes(tamanho_bloco=12)]
+    print(f"📦 Blocos de até 12 bytes: {blocos}")
+    cadastro.fechar()
+
+    print("\nConsultas preguiçosas:")
+    ti.adicionar("Ana")
+    ti.adicionar("Beatriz")
+    iniciais = ti.consulta().filtrar(lambda nome: len(nome) > 3).mapear(str.upper).pegar(3)
+    print(f"🔎 {list(iniciais)}")
+    print(f"🗂️ {ti.consulta().agrupar(lambda nome: nome[0])}")
+
+    caminho = os.path.join(tempfile.mkdtemp(), "ordenado.txt")
+    ordenado = DepartamentoArquivo(caminho, ordenado=True)
+    for nome in sorted(["Alice", "Amanda", "Bruno", "Bianca", "Carla", "Caio", "Diego"]):
+        ordenado.adicionar(nome)
+    print(f"🔤 Começam com 'B' (busca binária): {list(ordenado.consulta().com_prefixo('B'))}")
+    ordenado.fechar()
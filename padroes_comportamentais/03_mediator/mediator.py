@@ -1,4 +1,8 @@
 from abc import ABC, abstractmethod
+from collections import deque
+import queue
+import threading
+import time
 
 # Mediator
 class SalaDeChat(ABC):
@@ -27,11 +31,131 @@ class SalaConcreta(SalaDeChat):
     def adicionar_usuario(self, usuario: Usuario):
         self.usuarios.append(usuario)
 
+    def remover_usuario(self, usuario: Usuario):
+        self.usuarios.remove(usuario)
+
     def enviar(self, mensagem: str, remetente):
         for usuario in self.usuarios:
             if usuario != remetente:
                 usuario.receber(mensagem, remetente)
 
+# Mediator fragmentado: membros divididos entre threads, entrega em lotes
+_REMOVER = object()  # item de controle: a thread do fragmento tira o membro da lista
+
+class _Fragmento:
+    def __init__(self, sala, tamanho_lote):
+        self.usuarios = []
+        self.fila = queue.Queue()
+        self._sala = sala
+        self._tamanho_lote = tamanho_lote
+        self.erros = 0
+        self.ultimo_erro = None
+        self.thread = threading.Thread(target=self._executar, daemon=True)
+        self.thread.start()
+
+    def _executar(self):
+        while True:
+            lote = [self.fila.get()]
+            while len(lote) < self._tamanho_lote:
+                try:
+                    lote.append(self.fila.get_nowait())
+                except queue.Empty:
+                    break
+            usuarios = self.usuarios
+            for item in lote:
+                if item is None:
+                    for _ in lote:
+                        self.fila.task_done()
+                    return
+                mensagem, remetente, enviada_em = item
+                if mensagem is _REMOVER:
+                    # Na ordem da fila: quem sai ainda recebe o que foi enviado antes
+                    usuarios.remove(remetente)
+                    continue
+                for usuario in usuarios:
+                    if usuario is not remetente:
+                        # Um membro com defeito não pode derrubar a thread do fragmento
+                        try:
+                            usuario.receber(mensagem, remetente)
+                        except Exception as erro:
+                            self.erros += 1
+                            self.ultimo_erro = erro
+                self._sala._registrar_latencia(time.perf_counter() - enviada_em)
+            for _ in lote:
+                self.fila.task_done()
+
+class SalaFragmentada(SalaDeChat):
+    def __init__(self, fragmentos=4, tamanho_lote=64, amostras_latencia=10_000):
+        self._lock = threading.Lock()
+        self._latencias = deque(maxlen=amostras_latencia)
+        self._fragmentos = [_Fragmento(self, tamanho_lote) for _ in range(fragmentos)]
+        self._fragmento_de = {}  # usuário -> fragmento em que ele está
+        self._total = 0
+        self._aberta = True
+
+    def adicionar_usuario(self, usuario: Usuario):
+        fragmento = self._fragmentos[self._total % len(self._fragmentos)]
+        fragmento.usuarios.append(usuario)
+        self._fragmento_de[usuario] = fragmento
+        self._total += 1
+
+    def remover_usuario(self, usuario: Usuario):
+        # A lista é alterada pela própria thread do fragmento, nunca durante uma entrega
+        fragmento = self._fragmento_de.pop(usuario, None)
+        if fragmento is None:
+            raise ValueError(f"{usuario.nome} não está na sala")
+        fragmento.fila.put((_REMOVER, usuario, None))
+
+    def enviar(self, mensagem: str, remetente):
+        # Só enfileira: o remetente não espera a entrega
+        if not self._aberta:
+            raise RuntimeError("SalaFragmentada já foi fechada")
+        enviada_em = time.perf_counter()
+        for fragmento in self._fragmentos:
+            fragmento.fila.put((mensagem, remetente, enviada_em))
+
+    def _registrar_latencia(self, segundos):
+        with self._lock:
+            self._latencias.append(segundos)
+
+    def aguardar(self):
+        for fragmento in self._fragmentos:
+            fragmento.fila.join()
+
+    @property
+    def erros(self):
+        return sum(fragmento.erros for fragmento in self._fragmentos)
+
+    def latencias(self):
+        # Latência de entrega por fragmento (envio -> último membro do fragmento)
+        with self._lock:
+            amostras = sorted(self._latencias)
+        if not amostras:
+            return {}
+        return {
+            "p50": amostras[len(amostras) // 2],
+            "p99": amostras[min(len(amostras) - 1, int(len(amostras) * 0.99))],
+            "max": amostras[-1],
+        }
+
+    def fechar(self):
+        if not self._aberta:
+            return
+        self._aberta = False
+        for fragmento in self._fragmentos:
+            fragmento.fila.put(None)
+        for fragmento in self._fragmentos:
+            fragmento.thread.join()
+
+# Colleague que só conta mensagens (para salas grandes)
+class UsuarioSilencioso(Usuario):
+    def __init__(self, nome: str, sala: SalaDeChat):
+        super().__init__(nome, sala)
+        self.recebidas = 0
+
+    def receber(self, mensagem: str, remetente):
+        self.recebidas += 1
+
 # Cliente
 if __name__ == "__main__":
     sala = SalaConcreta()
@@ -46,3 +170,19 @@ if __name__ == "__main__":
 
     alice.enviar("Oi, pessoal!")
     bob.enviar("E aí, tudo bem?")
+
+    print("\n--- Sala fragmentada com 100 mil membros ---")
+    grande = SalaFragmentada(fragmentos=4)
+    membros = [UsuarioSilencioso(f"membro-{i}", grande) for i in range(100_000)]
+    for membro in membros:
+        grande.adicionar_usuario(membro)
+
+    inicio = time.perf_counter()
+    for i in range(10):
+        grande.enviar(f"aviso {i}", membros[0])
+    print(f"📤 10 envios retornaram em {(time.perf_counter() - inicio) * 1000:.2f} ms")
+
+    grande.aguardar()
+    print(f"📩 Entregas: {sum(m.recebidas for m in membros)}")
+    print("⏱️ Latências (s):", {k: round(v, 4) for k, v in grande.latencias().items()})
+    grande.fechar()
@@ -0,0 +1,198 @@
+import argparse
+import asyncio
+import struct
+import time
+
+from mediator import SalaConcreta, Usuario
+
+# Protocolo binário: cabeçalho = tipo (1 byte) + tamanho do payload (4 bytes)
+CABECALHO = struct.Struct("!BI")
+ENTRAR = 1      # cliente -> servidor: "sala\0nome"
+MENSAGEM = 2    # cliente -> servidor: texto (bytes)
+ENTREGA = 3     # servidor -> cliente: tamanho do nome (2 bytes) + nome + texto
+BEM_VINDO = 4   # servidor -> cliente: confirmação de entrada na sala
+TAMANHO_NOME = struct.Struct("!H")
+
+# Conexões que acumulam mais que isso sem ler são desconectadas
+LIMITE_BUFFER_SAIDA = 4 * 1024 * 1024
+# Quadros maiores que isso derrubam a conexão (o cliente não escolhe quanto o servidor aloca)
+TAMANHO_MAXIMO_QUADRO = 64 * 1024
+
+class QuadroInvalido(ValueError):
+    pass
+
+def quadro(tipo, payload):
+    return CABECALHO.pack(tipo, len(payload)), payload
+
+async def ler_quadro(reader: asyncio.StreamReader, limite=TAMANHO_MAXIMO_QUADRO):
+    tipo, tamanho = CABECALHO.unpack(await reader.readexactly(CABECALHO.size))
+    if tamanho > limite:
+        raise QuadroInvalido(f"quadro de {tamanho} bytes excede o limite de {limite}")
+    return tipo, await reader.readexactly(tamanho)
+
+def ler_entrada(payload):
+    # "sala\0nome" em UTF-8; qualquer outra coisa é um quadro inválido
+    try:
+        nome_sala, nome = payload.decode().split("\0", 1)
+    except (UnicodeDecodeError, ValueError):
+        raise QuadroInvalido("quadro de entrada malformado") from None
+    return nome_sala, nome
+
+# Colleague remoto: receber() só enfileira; a escrita é agrupada por volta do loop
+class UsuarioRemoto(Usuario):
+    def __init__(self, nome: str, sala: SalaConcreta, writer: asyncio.StreamWriter):
+        super().__init__(nome, sala)
+        nome_bytes = nome.encode()
+        self._prefixo = TAMANHO_NOME.pack(len(nome_bytes)) + nome_bytes
+        self._writer = writer
+        self._pendentes = []
+        self._agendado = False
+
+    def receber(self, mensagem, remetente):
+        payload = remetente._prefixo + mensagem
+        self._pendentes.extend(quadro(ENTREGA, payload))
+        if not self._agendado:
+            self._agendado = True
+            asyncio.get_running_loop().call_soon(self._descarregar)
+
+    def _descarregar(self):
+        self._agendado = False
+        pendentes, self._pendentes = self._pendentes, []
+        if self._writer.is_closing():
+            return
+        self._writer.writelines(pendentes)  # escrita vetorizada
+        if self._writer.transport.get_write_buffer_size() > LIMITE_BUFFER_SAIDA:
+            self._writer.close()
+
+class ServidorChat:
+    def __init__(self):
+        self._salas = {}
+        self._conexoes = set()
+
+    def sala(self, nome):
+        if nome not in self._salas:
+            self._salas[nome] = SalaConcreta()
+        return self._salas[nome]
+
+    async def atender(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        usuario = None
+        tarefa = asyncio.current_task()
+        self._conexoes.add(tarefa)
+        try:
+            tipo, payload = await ler_quadro(reader)
+            if tipo != ENTRAR:
+                return
+            nome_sala, nome = ler_entrada(payload)
+            sala = self.sala(nome_sala)
+            usuario = UsuarioRemoto(nome, sala, writer)
+            sala.adicionar_usuario(usuario)
+            writer.writelines(quadro(BEM_VINDO, b""))
+
+            while True:
+                tipo, payload = await ler_quadro(reader)
+                if tipo == MENSAGEM:
+                    sala.enviar(payload, usuario)
+                    await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, QuadroInvalido):
+            pass
+        finally:
+            if usuario is not None:
+                usuario.sala.remover_usuario(usuario)
+            writer.close()
+            self._conexoes.discard(tarefa)
+
+    async def iniciar(self, host="127.0.0.1", porta=8888, unix=None):
+        if unix:
+            return await asyncio.start_unix_server(self.atender, path=unix)
+        return await asyncio.start_server(self.atender, host, porta, backlog=4096)
+
+    async def encerrar(self, servidor):
+        servidor.close()
+        await servidor.wait_closed()
+        await asyncio.gather(*self._conexoes, return_exceptions=True)
+
+# Gerador de carga: conexões locais, alguns remetentes, todos medem a latência de fan-out
+async def _conectar(host, porta, unix):
+    if unix:
+        return await asyncio.open_unix_connection(unix)
+    return await asyncio.open_connection(host, porta)
+
+async def gerar_carga(host="127.0.0.1", porta=8888, unix=None, conexoes=1000,
+                      remetentes=10, mensagens=100, sala="geral"):
+    clientes = []
+    for i in range(conexoes):
+        reader, writer = await _conectar(host, porta, unix)
+        writer.writelines(quadro(ENTRAR, f"{sala}\0cliente-{i}".encode()))
+        clientes.append((reader, writer))
+    for reader, _ in clientes:
+        await ler_quadro(reader)  # BEM_VINDO
+
+    esperadas = remetentes * mensagens * (conexoes - 1)
+    latencias = []
+    relogio = time.perf_counter_ns
+
+    async def receber(reader, quantidade):
+        for _ in range(quantidade):
+            _, payload = await ler_quadro(reader)
+            (tamanho_nome,) = TAMANHO_NOME.unpack_from(payload)
+            enviada_em = int.from_bytes(payload[2 + tamanho_nome:2 + tamanho_nome + 8], "big")
+            latencias.append(relogio() - enviada_em)
+
+    async def enviar(writer):
+        for _ in range(mensagens):
+            writer.writelines(quadro(MENSAGEM, relogio().to_bytes(8, "big") + b"oi"))
+            await writer.drain()
+
+    inicio = time.perf_counter()
+    recepcao = []
+    for indice, (reader, _) in enumerate(clientes):
+        # Remetentes não recebem as próprias mensagens
+        proprias = mensagens if indice < remetentes else 0
+        recepcao.append(asyncio.ensure_future(receber(reader, remetentes * mensagens - proprias)))
+    await asyncio.gather(*(enviar(writer) for _, writer in clientes[:remetentes]))
+    await asyncio.gather(*recepcao)
+    duracao = time.perf_counter() - inicio
+
+    for _, writer in clientes:
+        writer.close()
+    await asyncio.gather(*(writer.wait_closed() for _, writer in clientes), return_exceptions=True)
+
+    latencias.sort()
+    return {
+        "entregas": len(latencias),
+        "esperadas": esperadas,
+        "entregas_por_segundo": len(latencias) / duracao,
+        "mensagens_por_segundo": remetentes * mensagens / duracao,
+        "p50_ms": latencias[len(latencias) // 2] / 1e6,
+        "p99_ms": latencias[int(len(latencias) * 0.99)] / 1e6,
+    }
+
+# Cliente
+async def main(argumentos):
+    if argumentos.modo in ("servidor", "demo"):
+        chat = ServidorChat()
+        servidor = await chat.iniciar(argumentos.host, argumentos.porta, argumentos.unix)
+        print(f"💬 Servidor de chat ouvindo em {argumentos.unix or f'{argumentos.host}:{argumentos.porta}'}")
+        if argumentos.modo == "servidor":
+            async with servidor:
+                await servidor.serve_forever()
+            return
+    resultado = await gerar_carga(argumentos.host, argumentos.porta, argumentos.unix,
+                                  argumentos.conexoes, argumentos.remetentes, argumentos.mensagens)
+    print(f"📊 {resultado['entregas']}/{resultado['esperadas']} entregas | "
+          f"{resultado['mensagens_por_segundo']:.0f} msg/s | "
+          f"{resultado['entregas_por_segundo']:.0f} entregas/s | "
+          f"p50 {resultado['p50_ms']:.2f} ms | p99 {resultado['p99_ms']:.2f} ms")
+    if argumentos.modo == "demo":
+        await chat.encerrar(servidor)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor de chat sobre o Mediator")
+    parser.add_argument("modo", nargs="?", default="demo", choices=["demo", "servidor", "carga"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8888)
+    parser.add_argument("--unix", help="caminho de um socket Unix (em vez de TCP)")
+    parser.add_argument("--conexoes", type=int, default=200)
+    parser.add_argument("--remetentes", type=int, default=5)
+    parser.add_argument("--mensagens", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
@@ -1,27 +1,130 @@
+# Rope persistente (imutável): inserções criam O(log n) nós novos e
+# compartilham o resto, então guardar uma versão antiga custa O(1)
+TAMANHO_FOLHA = 64
+
+class _Folha:
+    __slots__ = ("texto", "tamanho", "altura")
+
+    def __init__(self, texto):
+        self.texto = texto
+        self.tamanho = len(texto)
+        self.altura = 0
+
+class _No:
+    __slots__ = ("esq", "dir", "tamanho", "altura")
+
+    def __init__(self, esq, dir):
+        self.esq = esq
+        self.dir = dir
+        self.tamanho = esq.tamanho + dir.tamanho
+        self.altura = 1 + max(esq.altura, dir.altura)
+
+def _balancear(esq, dir):
+    # Rotações de AVL para alturas que diferem em até 2
+    if esq.altura > dir.altura + 1:
+        if esq.esq.altura >= esq.dir.altura:
+            return _No(esq.esq, _No(esq.dir, dir))
+        return _No(_No(esq.esq, esq.dir.esq), _No(esq.dir.dir, dir))
+    if dir.altura > esq.altura + 1:
+        if dir.dir.altura >= dir.esq.altura:
+            return _No(_No(esq, dir.esq), dir.dir)
+        return _No(_No(esq, dir.esq.esq), _No(dir.esq.dir, dir.dir))
+    return _No(esq, dir)
+
+def _juntar(esq, dir):
+    if esq is None or esq.tamanho == 0:
+        return dir
+    if dir is None or dir.tamanho == 0:
+        return esq
+    if isinstance(esq, _Folha) and isinstance(dir, _Folha) and \
+            esq.tamanho + dir.tamanho <= TAMANHO_FOLHA:
+        return _Folha(esq.texto + dir.texto)
+    if esq.altura > dir.altura + 1:
+        return _balancear(esq.esq, _juntar(esq.dir, dir))
+    if dir.altura > esq.altura + 1:
+        return _balancear(_juntar(esq, dir.esq), dir.dir)
+    return _No(esq, dir)
+
+def _dividir(no, posicao):
+    if no is None:
+        return None, None
+    if isinstance(no, _Folha):
+        return _Folha(no.texto[:posicao]), _Folha(no.texto[posicao:])
+    if posicao <= no.esq.tamanho:
+        esq, dir = _dividir(no.esq, posicao)
+        return esq, _juntar(dir, no.dir)
+    esq, dir = _dividir(no.dir, posicao - no.esq.tamanho)
+    return _juntar(no.esq, esq), dir
+
+class Rope:
+    __slots__ = ("_raiz",)
+
+    def __init__(self, raiz=None):
+        self._raiz = raiz
+
+    def __len__(self):
+        return self._raiz.tamanho if self._raiz is not None else 0
+
+    def inserir(self, posicao, texto):
+        novo = None
+        for inicio in range(0, len(texto), TAMANHO_FOLHA):
+            novo = _juntar(novo, _Folha(texto[inicio:inicio + TAMANHO_FOLHA]))
+        if posicao >= len(self):
+            return Rope(_juntar(self._raiz, novo))
+        esq, dir = _dividir(self._raiz, posicao)
+        return Rope(_juntar(_juntar(esq, novo), dir))
+
+    def apagar(self, inicio, fim):
+        esq, resto = _dividir(self._raiz, inicio)
+        _, dir = _dividir(resto, fim - inicio)
+        return Rope(_juntar(esq, dir))
+
+    def __str__(self):
+        partes = []
+        pilha = [self._raiz] if self._raiz is not None else []
+        while pilha:
+            no = pilha.pop()
+            if isinstance(no, _Folha):
+                partes.append(no.texto)
+            else:
+                pilha.append(no.dir)
+                pilha.append(no.esq)
+        return "".join(partes)
+
 # Memento
 class EditorMemento:
-    def __init__(self, texto):
-        self._texto = texto
+    def __init__(self, estado: Rope):
+        self._estado = estado
+
+    def get_estado(self):
+        return self._estado
 
     def get_texto(self):
-        return self._texto
+        return str(self._estado)
 
 # Originator
 class EditorTexto:
     def __init__(self):
-        self._texto = ""
+        self._texto = Rope()
 
     def digitar(self, texto):
-        self._texto += texto
+        self._texto = self._texto.inserir(len(self._texto), texto)
+
+    def inserir(self, posicao, texto):
+        self._texto = self._texto.inserir(posicao, texto)
+
+    def apagar(self, inicio, fim):
+        self._texto = self._texto.apagar(inicio, fim)
 
     def exibir(self):
         print(f"📝 Texto atual: {self._texto}")
 
     def salvar(self):
+        # O(1): a rope é imutável, então basta guardar a referência
         return EditorMemento(self._texto)
 
     def restaurar(self, memento: EditorMemento):
-        self._texto = memento.get_texto()
+        self._texto = memento.get_estado()
 
 # Caretaker
 class Historico:
@@ -56,3 +159,11 @@ if __name__ == "__main__":
     print("\n🔙 Desfazendo novamente...")
     editor.restaurar(historico.desfazer())
     editor.exibir()
+
+    print("\n✍️ Editando no meio do texto...")
+    editor.inserir(3, " de novo")
+    historico.salvar_estado(editor.salvar())
+    editor.apagar(0, 3)
+    editor.exibir()
+    editor.restaurar(historico.desfazer())
+    editor.exibir()
@@ -1,4 +1,10 @@
 from abc import ABC, abstractmethod
+from collections import deque
+import heapq
+import itertools
+import threading
+import time
+import weakref
 
 # Observer
 class Observador(ABC):
@@ -6,26 +12,316 @@ class Observador(ABC):
     def atualizar(self, clima: str):
         pass
 
+# Entrega assíncrona: cada observador tem sua fila limitada; um pool compartilhado
+# de threads esvazia as filas, uma entrega por vez para cada observador
+BLOQUEAR = "bloquear"
+DESCARTAR_ANTIGO = "descartar_antigo"
+COALESCER = "coalescer"
+
+class PoolEntregas:
+    def __init__(self, trabalhadores=4):
+        self._prontas = deque()  # entregas com itens na fila, na ordem em que ficaram prontas
+        self._condicao = threading.Condition()
+        self._threads = [threading.Thread(target=self._trabalhar, daemon=True)
+                         for _ in range(trabalhadores)]
+        for thread in self._threads:
+            thread.start()
+
+    def agendar(self, entrega):
+        with self._condicao:
+            self._prontas.append(entrega)
+            self._condicao.notify()
+
+    def _trabalhar(self):
+        while True:
+            with self._condicao:
+                self._condicao.wait_for(lambda: self._prontas)
+                entrega = self._prontas.popleft()
+            if entrega is None:
+                return
+            if entrega._entregar_proximo():
+                self.agendar(entrega)  # volta para o fim: observadores se revezam
+
+    def encerrar(self):
+        with self._condicao:
+            self._prontas.extend([None] * len(self._threads))
+            self._condicao.notify_all()
+        for thread in self._threads:
+            thread.join()
+
+_pool_padrao = None
+_lock_pool = threading.Lock()
+
+def pool_padrao():
+    global _pool_padrao
+    with _lock_pool:
+        if _pool_padrao is None:
+            _pool_padrao = PoolEntregas()
+        return _pool_padrao
+
+class EntregaAssincrona(Observador):
+    def __init__(self, observador: Observador, capacidade=64, politica=DESCARTAR_ANTIGO,
+                 pool: PoolEntregas = None):
+        if politica not in (BLOQUEAR, DESCARTAR_ANTIGO, COALESCER):
+            raise ValueError(f"Política de transbordo desconhecida: {politica}")
+        self.observador = observador
+        self._capacidade = capacidade
+        self._politica = politica
+        self._pool = pool or pool_padrao()
+        self._fila = deque()
+        self._condicao = threading.Condition()
+        self._agendada = False
+        self.descartados = 0
+        self.erros = 0
+        self.ultimo_erro = None
+
+    def atualizar(self, clima: str):
+        with self._condicao:
+            if self._politica == COALESCER:
+                # Só o estado mais recente interessa
+                self.descartados += len(self._fila)
+                self._fila.clear()
+            elif len(self._fila) >= self._capacidade:
+                if self._politica == BLOQUEAR:
+                    self._condicao.wait_for(lambda: len(self._fila) < self._capacidade)
+                else:
+                    self._fila.popleft()
+                    self.descartados += 1
+            self._fila.append(clima)
+            agendar = not self._agendada
+            self._agendada = True
+        if agendar:
+            self._pool.agendar(self)
+
+    def _entregar_proximo(self):
+        # Chamado por uma thread do pool; devolve True se ainda houver itens na fila
+        with self._condicao:
+            clima = self._fila.popleft()
+            self._condicao.notify_all()
+        try:
+            self.observador.atualizar(clima)
+        except Exception as erro:
+            # Um observador com defeito não derruba a entrega dos próximos itens
+            self.erros += 1
+            self.ultimo_erro = erro
+        with self._condicao:
+            if self._fila:
+                return True
+            self._agendada = False
+            self._condicao.notify_all()
+            return False
+
+    def fechar(self):
+        # Aguarda o pool entregar o que ainda está na fila
+        with self._condicao:
+            self._condicao.wait_for(lambda: not self._agendada)
+
+# Limitação de taxa: no máximo uma entrega por intervalo, o valor mais recente vence
+_NADA = object()
+
+# Uma única thread dispara todos os prazos (heap por instante), em vez de um Timer por espera
+class _Agendador:
+    def __init__(self):
+        self._prazos = []
+        self._sequencia = itertools.count()
+        self._condicao = threading.Condition()
+        self._thread = None
+
+    def agendar(self, instante, funcao, *argumentos):
+        with self._condicao:
+            heapq.heappush(self._prazos, (instante, next(self._sequencia), funcao, argumentos))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._executar, daemon=True)
+                self._thread.start()
+            self._condicao.notify()
+
+    def _executar(self):
+        while True:
+            with self._condicao:
+                while True:
+                    if not self._prazos:
+                        self._condicao.wait()
+                        continue
+                    espera = self._prazos[0][0] - time.monotonic()
+                    if espera <= 0:
+                        _, _, funcao, argumentos = heapq.heappop(self._prazos)
+                        break
+                    self._condicao.wait(espera)
+            funcao(*argumentos)
+
+_agendador = _Agendador()
+
+class EntregaLimitada(Observador):
+    def __init__(self, observador: Observador, intervalo, debounce=False):
+        self.observador = observador
+        self._intervalo = intervalo
+        self._debounce = debounce  # True: só entrega após "intervalo" sem novidades
+        self._lock = threading.Lock()
+        self._ultima_entrega = float("-inf")
+        self._pendente = _NADA
+        self._prazo = None  # instante da próxima entrega; None = nada agendado
+        self._geracao = 0
+        self.entregues = 0
+        self.evitadas = 0
+        self.erros = 0
+
+    def atualizar(self, clima: str):
+        with self._lock:
+            agora = time.monotonic()
+            if self._pendente is not _NADA:
+                self.evitadas += 1
+            livre = agora - self._ultima_entrega >= self._intervalo
+            if not self._debounce and self._prazo is None and livre:
+                self._ultima_entrega = agora
+                self.entregues += 1
+                entregar_agora = True
+            else:
+                self._pendente = clima
+                agendar = self._prazo is None
+                if self._debounce:
+                    # Só empurra o prazo: quem já está agendado confere de novo ao disparar
+                    self._prazo = agora + self._intervalo
+                elif agendar:
+                    self._prazo = self._ultima_entrega + self._intervalo
+                if agendar:
+                    _agendador.agendar(self._prazo, self._disparar, self._geracao)
+                entregar_agora = False
+        if entregar_agora:
+            self.observador.atualizar(clima)
+
+    def _disparar(self, geracao):
+        # Roda na thread do agendador: para observadores lentos, combine com assincrono=True
+        with self._lock:
+            if geracao != self._geracao or self._prazo is None:
+                return  # fechada depois de agendar
+            if time.monotonic() < self._prazo:
+                _agendador.agendar(self._prazo, self._disparar, geracao)  # prazo foi adiado
+                return
+            self._prazo = None
+        try:
+            self._descarregar()
+        except Exception:
+            self.erros += 1  # não derruba o agendador, que é compartilhado
+
+    def _descarregar(self):
+        with self._lock:
+            clima, self._pendente = self._pendente, _NADA
+            if clima is _NADA:
+                return
+            self._ultima_entrega = time.monotonic()
+            self.entregues += 1
+        self.observador.atualizar(clima)
+
+    def fechar(self):
+        with self._lock:
+            self._prazo = None
+            self._geracao += 1
+        self._descarregar()
+        fechar = getattr(self.observador, "fechar", None)
+        if fechar is not None:
+            fechar()
+
+# Registro de inscritos: referências fracas, remoção O(1) e índice por tópico
+class RegistroObservadores:
+    def __init__(self):
+        self._por_topico = {}  # tópico (None = todos) -> {id: (referência, fraco, filtro)}
+        self._topico_de = {}   # id -> tópico
+
+    def adicionar(self, observador: Observador, topico=None, filtro=None, fraco=True):
+        chave = id(observador)
+        self.remover(observador)
+        referencia = weakref.ref(observador, lambda _: self._descartar(chave)) if fraco else observador
+        self._por_topico.setdefault(topico, {})[chave] = (referencia, fraco, filtro)
+        self._topico_de[chave] = topico
+
+    def _descartar(self, chave):
+        topico = self._topico_de.pop(chave, None)
+        inscritos = self._por_topico.get(topico)
+        if inscritos is not None:
+            inscritos.pop(chave, None)
+            if not inscritos:
+                del self._por_topico[topico]
+
+    def remover(self, observador: Observador):
+        if id(observador) in self._topico_de:
+            self._descartar(id(observador))
+
+    def interessados(self, topico, valor):
+        grupos = [self._por_topico.get(None)]
+        if topico is not None:
+            grupos.append(self._por_topico.get(topico))
+        for inscritos in grupos:
+            if not inscritos:
+                continue
+            for referencia, fraco, filtro in list(inscritos.values()):
+                observador = referencia() if fraco else referencia
+                if observador is None or (filtro is not None and not filtro(valor)):
+                    continue
+                yield observador
+
+    def __len__(self):
+        return len(self._topico_de)
+
 # Subject
 class EstacaoClimatica:
-    def __init__(self):
-        self._observadores = []
+    def __init__(self, pool: PoolEntregas = None):
+        # Observadores simples ficam com referência fraca; as entregas criadas
+        # pela estação (assíncronas/limitadas) pertencem a ela e são fortes
+        self._pool = pool
+        self._observadores = RegistroObservadores()
+        self._entregas = {}
         self._clima = None
 
-    def adicionar(self, observador: Observador):
-        self._observadores.append(observador)
+    def adicionar(self, observador: Observador, assincrono=False, capacidade=64,
+                  politica=DESCARTAR_ANTIGO, intervalo=None, debounce=False,
+                  topico=None, filtro=None):
+        # Uma inscrição por observador: a anterior (simples ou embrulhada) é desfeita
+        self.remover(observador)
+        entrega = observador
+        if assincrono:
+            entrega = EntregaAssincrona(entrega, capacidade, politica, self._pool)
+        if intervalo is not None:
+            entrega = EntregaLimitada(entrega, intervalo, debounce)
+        if entrega is not observador:
+            self._entregas[observador] = entrega
+        self._observadores.adicionar(entrega, topico, filtro, fraco=entrega is observador)
+        return entrega
 
     def remover(self, observador: Observador):
-        self._observadores.remove(observador)
+        entrega = self._entregas.pop(observador, None)
+        if entrega is not None:
+            self._observadores.remover(entrega)
+            entrega.fechar()
+        else:
+            self._observadores.remover(observador)
+
+    def fechar(self):
+        for entrega in list(self._entregas.values()):
+            entrega.fechar()
+
+    def estatisticas(self):
+        evitadas = descartados = erros = 0
+        for entrega in self._entregas.values():
+            while entrega is not None:
+                evitadas += getattr(entrega, "evitadas", 0)
+                descartados += getattr(entrega, "descartados", 0)
+                erros += getattr(entrega, "erros", 0)
+                entrega = getattr(entrega, "observador", None)
+        return {"evitadas": evitadas, "descartados": descartados, "erros": erros}
 
-    def notificar(self):
-        for observador in self._observadores:
+    def __len__(self):
+        return len(self._observadores)
+
+    def notificar(self, topico=None):
+        # Só quem assina tudo ou o tópico informado é chamado
+        for observador in self._observadores.interessados(topico, self._clima):
             observador.atualizar(self._clima)
 
-    def setar_clima(self, clima: str):
-        print(f"\n📡 Estação: novo clima detectado: {clima}")
+    def setar_clima(self, clima: str, topico=None):
+        local = f" ({topico})" if topico else ""
+        print(f"\n📡 Estação{local}: novo clima detectado: {clima}")
         self._clima = clima
-        self.notificar()
+        self.notificar(topico)
 
 # Observadores concretos
 class AlertaSMS(Observador):
@@ -36,6 +332,15 @@ class AlertaEmail(Observador):
     def atualizar(self, clima: str):
         print(f"📧 Email: Aviso meteorológico: {clima}")
 
+class Painel(Observador):
+    def atualizar(self, clima: str):
+        print(f"🖥️ Painel: {clima}")
+
+class GatewaySMSLento(Observador):
+    def atualizar(self, clima: str):
+        time.sleep(0.2)  # simula um gateway externo lento
+        print(f"🐢 Gateway SMS: {clima}")
+
 # Cliente
 if __name__ == "__main__":
     estacao = EstacaoClimatica()
@@ -48,3 +353,36 @@ if __name__ == "__main__":
 
     estacao.setar_clima("Tempestade")
     estacao.setar_clima("Sol forte")
+
+    print("\n--- Entrega assíncrona com observador lento ---")
+    estacao.remover(sms)
+    lento = GatewaySMSLento()
+    entrega = estacao.adicionar(lento, assincrono=True, politica=COALESCER)
+
+    inicio = time.perf_counter()
+    for clima in ("Garoa", "Chuva", "Granizo", "Neblina"):
+        estacao.setar_clima(clima)
+    print(f"\n⏱️ Publicação levou {time.perf_counter() - inicio:.3f}s")
+
+    print(f"🗑️ Atualizações coalescidas para o gateway: {entrega.descartados}")
+
+    print("\n--- Sensor de alta frequência com limite de 1 entrega a cada 0,5s ---")
+    sensor = EstacaoClimatica()
+    sensor.adicionar(Painel(), intervalo=0.5)
+    for leitura in range(30):
+        sensor.setar_clima(f"{20 + leitura / 10:.1f}°C")
+        time.sleep(0.05)
+    sensor.fechar()
+    estacao.fechar()
+    print(f"📊 Estatísticas do sensor: {sensor.estatisticas()}")
+
+    print("\n--- Inscrições por tópico e com referência fraca ---")
+    regional = EstacaoClimatica()
+    painel_sp = Painel()
+    regional.adicionar(painel_sp, topico="SP")
+    regional.adicionar(email, filtro=lambda clima: "Tempestade" in clima)
+    regional.adicionar(AlertaSMS())  # ninguém mais referencia: sai do registro sozinho
+
+    regional.setar_clima("Nublado", topico="RJ")
+    regional.setar_clima("Tempestade", topico="SP")
+    print(f"\n👥 Inscritos ativos: {len(regional)}")
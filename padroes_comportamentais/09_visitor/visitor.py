@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+import time
 
 # Visitor
 class Visitor(ABC):
@@ -10,25 +11,120 @@ class Visitor(ABC):
 
 # Element
 class Elemento(ABC):
+    pai = None
+
     @abstractmethod
     def aceitar(self, visitor: Visitor): pass
 
+    def __getstate__(self):
+        # Ao serializar uma subárvore, não leva junto a árvore inteira via "pai"
+        estado = self.__dict__.copy()
+        estado.pop("pai", None)
+        return estado
+
 # Elementos concretos
 class Arquivo(Elemento):
+    metodo_visita = "visitar_arquivo"
+
     def __init__(self, nome, tamanho):
         self.nome = nome
         self.tamanho = tamanho
 
+    def redimensionar(self, novo_tamanho):
+        delta = novo_tamanho - self.tamanho
+        self.tamanho = novo_tamanho
+        if self.pai is not None:
+            self.pai._propagar(delta, 0)
+
     def aceitar(self, visitor: Visitor):
         visitor.visitar_arquivo(self)
 
 class Pasta(Elemento):
+    metodo_visita = "visitar_pasta"
+
     def __init__(self, nome):
         self.nome = nome
         self.conteudo = []
+        # Agregados da subárvore, mantidos incrementalmente
+        self._tamanho = 0
+        self._arquivos = 0
+        self._sujo = False
+
+    def __setstate__(self, estado):
+        # "pai" não é serializado: religa os filhos a esta pasta ao desserializar
+        self.__dict__.update(estado)
+        for item in self.conteudo:
+            item.pai = self
 
-    def adicionar(self, elemento: Elemento):
+    @staticmethod
+    def _contribuicao(elemento):
+        if isinstance(elemento, Pasta):
+            return elemento.tamanho, elemento.total_arquivos
+        return elemento.tamanho, 1
+
+    def adicionar(self, elemento: Elemento, propagar=True):
+        # propagar=False adia o cálculo (útil em cargas em lote)
+        if elemento.pai is not None:
+            elemento.pai.remover(elemento)  # sai da pasta antiga, que desconta seus agregados
         self.conteudo.append(elemento)
+        elemento.pai = self
+        if propagar and not self._sujo:
+            self._propagar(*self._contribuicao(elemento))
+        else:
+            self._marcar_sujo()
+
+    def remover(self, elemento: Elemento):
+        self.conteudo.remove(elemento)
+        elemento.pai = None
+        if self._sujo:
+            return
+        tamanho, arquivos = self._contribuicao(elemento)
+        self._propagar(-tamanho, -arquivos)
+
+    def _propagar(self, delta_tamanho, delta_arquivos):
+        pasta = self
+        while pasta is not None:
+            pasta._tamanho += delta_tamanho
+            pasta._arquivos += delta_arquivos
+            pasta = pasta.pai
+
+    def _marcar_sujo(self):
+        pasta = self
+        while pasta is not None and not pasta._sujo:
+            pasta._sujo = True
+            pasta = pasta.pai
+
+    def _recalcular(self):
+        # Pós-ordem iterativa, descendo apenas pelas pastas sujas
+        pilha = [(self, False)]
+        while pilha:
+            pasta, filhos_prontos = pilha.pop()
+            if filhos_prontos:
+                tamanho = arquivos = 0
+                for item in pasta.conteudo:
+                    if isinstance(item, Pasta):
+                        tamanho += item._tamanho
+                        arquivos += item._arquivos
+                    else:
+                        tamanho += item.tamanho
+                        arquivos += 1
+                pasta._tamanho, pasta._arquivos, pasta._sujo = tamanho, arquivos, False
+            elif pasta._sujo:
+                pilha.append((pasta, True))
+                pilha.extend((item, False) for item in pasta.conteudo
+                             if isinstance(item, Pasta) and item._sujo)
+
+    @property
+    def tamanho(self):
+        if self._sujo:
+            self._recalcular()
+        return self._tamanho
+
+    @property
+    def total_arquivos(self):
+        if self._sujo:
+            self._recalcular()
+        return self._arquivos
 
     def aceitar(self, visitor: Visitor):
         visitor.visitar_pasta(self)
@@ -47,6 +143,71 @@ class CalculadoraTamanho(Visitor):
         for item in pasta.conteudo:
             item.aceitar(self)
 
+# Visitor com tabela de despacho em cache por (classe do visitor, classe do elemento)
+class VisitorDespachado(Visitor):
+    _tabelas = {}
+
+    @classmethod
+    def _tabela(cls):
+        return VisitorDespachado._tabelas.setdefault(cls, {})
+
+    @classmethod
+    def _resolver(cls, classe_elemento):
+        tratador = getattr(cls, classe_elemento.metodo_visita)
+        cls._tabela()[classe_elemento] = tratador
+        return tratador
+
+    def visitar(self, elemento: Elemento):
+        tipo = type(elemento)
+        tratador = self._tabela().get(tipo) or self._resolver(tipo)
+        return tratador(self, elemento)
+
+    def visitar_todos(self, elementos):
+        # Despacha direto pela tabela, sem passar por aceitar()
+        tabela = self._tabela()
+        for elemento in elementos:
+            tipo = type(elemento)
+            tratador = tabela.get(tipo) or self._resolver(tipo)
+            tratador(self, elemento)
+
+class SomadorTamanho(VisitorDespachado):
+    def __init__(self):
+        self.total = 0
+
+    def visitar_arquivo(self, arquivo: Arquivo):
+        self.total += arquivo.tamanho
+
+    def visitar_pasta(self, pasta: Pasta):
+        pass
+
+# Percurso iterativo: pilha explícita no lugar da recursão
+def percorrer(raiz: Elemento, visitor: Visitor):
+    pilha = [raiz]
+    while pilha:
+        elemento = pilha.pop()
+        elemento.aceitar(visitor)
+        if isinstance(elemento, Pasta):
+            pilha.extend(reversed(elemento.conteudo))
+
+# Visitor concreto que não desce sozinho nas pastas (usado com percorrer)
+class CalculadoraTamanhoIterativa(Visitor):
+    def __init__(self):
+        self.total = 0
+
+    def visitar_arquivo(self, arquivo: Arquivo):
+        self.total += arquivo.tamanho
+
+    def visitar_pasta(self, pasta: Pasta):
+        pass
+
+# Não há versão com processos: a árvore vive na memória deste processo e levá-la
+# a outro custa tanto quanto percorrê-la aqui; para consultas repetidas, Pasta.tamanho
+# devolve o agregado mantido incrementalmente sem percorrer nada
+def tamanho_subarvore(raiz: Elemento):
+    calculadora = CalculadoraTamanhoIterativa()
+    percorrer(raiz, calculadora)
+    return calculadora.total
+
 # Cliente
 if __name__ == "__main__":
     raiz = Pasta("Documentos")
@@ -62,3 +223,54 @@ if __name__ == "__main__":
     raiz.aceitar(calculadora)
 
     print(f"\n📦 Tamanho total: {calculadora.total} KB")
+    print(f"📦 Tamanho mantido pela pasta: {raiz.tamanho} KB em {raiz.total_arquivos} arquivos")
+
+    app = subpasta.conteudo[0]
+    app.redimensionar(140)
+    subpasta.remover(subpasta.conteudo[1])
+    print(f"✏️ Após editar app.py e remover readme.md: {raiz.tamanho} KB "
+          f"em {raiz.total_arquivos} arquivos")
+
+    # Árvore muito profunda: a versão recursiva estouraria a pilha
+    profunda = Pasta("nivel-0")
+    atual = profunda
+    for i in range(1, 100_000):
+        filha = Pasta(f"nivel-{i}")
+        filha.adicionar(Arquivo(f"arquivo-{i}.txt", 1))
+        atual.adicionar(filha, propagar=False)  # carga em lote: recalcula só na consulta
+        atual = filha
+    print(f"🌲 Tamanho da árvore profunda (iterativo): {tamanho_subarvore(profunda)} KB")
+    print(f"🌲 Tamanho mantido pela pasta profunda: {profunda.tamanho} KB")
+
+    # Árvore larga: percurso completo vs. agregado mantido pela pasta
+    larga = Pasta("larga")
+    for i in range(64):
+        pasta = Pasta(f"pasta-{i}")
+        for j in range(1000):
+            pasta.adicionar(Arquivo(f"arquivo-{j}.bin", 2))
+        larga.adicionar(pasta)
+    inicio = time.perf_counter()
+    total = tamanho_subarvore(larga)
+    percurso = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    mantido = larga.tamanho
+    agregado = time.perf_counter() - inicio
+    print(f"🌳 Tamanho da árvore larga: {total} KB em {percurso * 1000:.1f} ms (percurso) | "
+          f"{mantido} KB em {agregado * 1e6:.1f} µs (agregado)")
+
+    # Micro-benchmark: aceitar() + visitar_*() vs. tabela de despacho em cache
+    elementos = [Arquivo(f"a{i}", 1) if i % 4 else Pasta(f"p{i}") for i in range(1_000_000)]
+
+    inicio = time.perf_counter()
+    calculadora = CalculadoraTamanhoIterativa()
+    for elemento in elementos:
+        elemento.aceitar(calculadora)
+    duplo_despacho = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    somador = SomadorTamanho()
+    somador.visitar_todos(elementos)
+    tabela = time.perf_counter() - inicio
+
+    print(f"⏱️ aceitar/visitar_*: {duplo_despacho:.3f}s | visitar_todos: {tabela:.3f}s "
+          f"({duplo_despacho / tabela:.2f}x)")